@@ -1,38 +1,33 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify
+from flask import (Flask, Blueprint, render_template, request, redirect, url_for, flash, session, jsonify,
+                   current_app, send_from_directory, abort, Response, stream_with_context)
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 from flask_login import LoginManager, UserMixin, login_user, logout_user, login_required, current_user
 from werkzeug.security import generate_password_hash, check_password_hash
-from datetime import datetime
+from datetime import datetime, timedelta
 import os
 from dotenv import load_dotenv
 import re
-import nltk
-from gtts import gTTS
+import sqlite3
 import tempfile
 import uuid
-import requests
 import json
 import hashlib
+import mimetypes
 import random
+import time
+import threading
+import click
 from urllib.parse import quote
 
 load_dotenv()
 
-app = Flask(__name__)
-app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key')
-app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', 'sqlite:///en_study.db')
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-
-db = SQLAlchemy(app)
+# 扩展和蓝图在导入时只创建对象，由create_app()绑定到应用
+db = SQLAlchemy()
 login_manager = LoginManager()
-login_manager.init_app(app)
-login_manager.login_view = 'admin_login'
-
-# 确保下载nltk数据
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt')
+login_manager.login_view = 'main.admin_login'
+bp = Blueprint('main', __name__, cli_group=None)
 
 
 # 数据库模型
@@ -45,19 +40,47 @@ class Chapter(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(200), nullable=False)
     created_date = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
-    contents = db.relationship('Content', backref='chapter', lazy=True, cascade='all, delete-orphan')
+    # 内容版本：内容项增删改时加一，用于页面缓存失效
+    content_version = db.Column(db.Integer, nullable=False, default=0)
+    contents = db.relationship('Content', backref='chapter', lazy=True, cascade='all, delete-orphan',
+                               order_by='(Content.position, Content.id)')
     words = db.relationship('Word', backref='chapter', lazy=True, cascade='all, delete-orphan')
     phrases = db.relationship('Phrase', backref='chapter', lazy=True, cascade='all, delete-orphan')
 
 
-class Content(db.Model):
+class Vocabulary(db.Model):
+    """去重后的词汇表：同一个单词或短语只获取一次音标和翻译，由多个章节共享"""
     id = db.Column(db.Integer, primary_key=True)
-    text = db.Column(db.String(300), nullable=False)  # 统一存储单词或短语
+    text = db.Column(db.String(300), nullable=False)
+    # 规范化后的文本（小写、合并空白），用于去重
+    key = db.Column(db.String(300), nullable=False, unique=True, index=True)
     translation = db.Column(db.String(400))
     phonetic = db.Column(db.String(200))
+    created_date = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    # 内容项总是需要词汇的音标和翻译，直接联表加载
+    contents = db.relationship('Content', backref=db.backref('vocabulary', lazy='joined'), lazy=True)
+
+
+class Content(db.Model):
+    """章节内容项：章节与词汇之间的关联，按position排序"""
+    id = db.Column(db.Integer, primary_key=True)
+    text = db.Column(db.String(300), nullable=False)  # 统一存储单词或短语
+    # 旧数据直接存储在内容项上的翻译和音标，迁移到词汇表后清空
+    legacy_translation = db.Column('translation', db.String(400))
+    legacy_phonetic = db.Column('phonetic', db.String(200))
     chapter_id = db.Column(db.Integer, db.ForeignKey('chapter.id'), nullable=False)
+    vocabulary_id = db.Column(db.Integer, db.ForeignKey('vocabulary.id'), index=True)
+    position = db.Column(db.Integer, nullable=False, default=0)
     created_date = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
 
+    @property
+    def translation(self):
+        return self.vocabulary.translation if self.vocabulary else self.legacy_translation
+
+    @property
+    def phonetic(self):
+        return self.vocabulary.phonetic if self.vocabulary else self.legacy_phonetic
+
 
 # 保留原有模型以兼容现有数据
 class Word(db.Model):
@@ -97,11 +120,203 @@ class TTSConfig(db.Model):
     updated_date = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
 
 
+class ProcessJob(db.Model):
+    """章节内容处理任务：一次导入对应一个任务，逐项状态见ProcessJobItem"""
+    id = db.Column(db.Integer, primary_key=True)
+    chapter_id = db.Column(db.Integer, db.ForeignKey('chapter.id'), nullable=False, index=True)
+    created_date = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    items = db.relationship('ProcessJobItem', backref='job', lazy=True, cascade='all, delete-orphan',
+                            order_by='ProcessJobItem.position')
+    chapter = db.relationship('Chapter', backref=db.backref('process_jobs', lazy=True, cascade='all, delete-orphan'))
+
+
+class ProcessJobItem(db.Model):
+    """持久化队列中的单个内容项"""
+    id = db.Column(db.Integer, primary_key=True)
+    job_id = db.Column(db.Integer, db.ForeignKey('process_job.id'), nullable=False, index=True)
+    chapter_id = db.Column(db.Integer, db.ForeignKey('chapter.id'), nullable=False)
+    position = db.Column(db.Integer, nullable=False, default=0)
+    text = db.Column(db.String(300), nullable=False)
+    # 状态：'pending' 等待，'running' 处理中，'done' 完成，'failed' 失败
+    status = db.Column(db.String(20), nullable=False, default='pending', index=True)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    error = db.Column(db.String(500))
+    # 失败后等待重试的时间，在此之前不会被领取
+    next_attempt_at = db.Column(db.DateTime)
+    # 处理完成后对应的内容项
+    content_id = db.Column(db.Integer)
+    created_date = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    updated_date = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+    finished_date = db.Column(db.DateTime, index=True)
+
+
+class WorkerHeartbeat(db.Model):
+    """后台worker心跳：最近一次轮询和领取队列项的时间，处理队列页面据此判断worker是否在运行"""
+    name = db.Column(db.String(50), primary_key=True)
+    pid = db.Column(db.Integer)
+    started_date = db.Column(db.DateTime)
+    last_poll = db.Column(db.DateTime)
+    last_claim = db.Column(db.DateTime)
+
+
+class PageCache(db.Model):
+    """渲染后的章节页面，按章节内容版本失效，多个worker进程共享"""
+    cache_key = db.Column(db.String(100), primary_key=True)
+    chapter_id = db.Column(db.Integer, nullable=False, index=True)
+    version = db.Column(db.Integer, nullable=False)
+    body = db.Column(db.Text, nullable=False)
+    created_date = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+
+class CacheStat(db.Model):
+    """页面缓存命中统计"""
+    name = db.Column(db.String(50), primary_key=True)
+    hits = db.Column(db.Integer, nullable=False, default=0)
+    misses = db.Column(db.Integer, nullable=False, default=0)
+
+
+def bump_chapter_version(connection, chapter_id):
+    chapter_table = Chapter.__table__
+    connection.execute(chapter_table.update().where(chapter_table.c.id == chapter_id)
+                       .values(content_version=chapter_table.c.content_version + 1))
+
+
+# 章节内容（包括旧的单词和短语）任何写入都会使该章节的页面缓存失效
+@event.listens_for(Content, 'after_insert')
+@event.listens_for(Content, 'after_update')
+@event.listens_for(Content, 'after_delete')
+@event.listens_for(Word, 'after_insert')
+@event.listens_for(Word, 'after_update')
+@event.listens_for(Word, 'after_delete')
+@event.listens_for(Phrase, 'after_insert')
+@event.listens_for(Phrase, 'after_update')
+@event.listens_for(Phrase, 'after_delete')
+def invalidate_chapter_pages(mapper, connection, target):
+    bump_chapter_version(connection, target.chapter_id)
+
+
+@event.listens_for(Vocabulary, 'after_update')
+def invalidate_vocabulary_pages(mapper, connection, target):
+    """词汇的音标或翻译更新后，引用它的章节页面缓存失效"""
+    chapter_table = Chapter.__table__
+    content_table = Content.__table__
+    chapter_ids = db.select(content_table.c.chapter_id).where(content_table.c.vocabulary_id == target.id)
+    connection.execute(chapter_table.update().where(chapter_table.c.id.in_(chapter_ids))
+                       .values(content_version=chapter_table.c.content_version + 1))
+
+
+class ProcessJobEvent(db.Model):
+    """处理任务的进度事件（只追加），id作为SSE的事件id用于断线续传"""
+    id = db.Column(db.Integer, primary_key=True)
+    job_id = db.Column(db.Integer, db.ForeignKey('process_job.id'), nullable=False, index=True)
+    item_id = db.Column(db.Integer, nullable=False)
+    # 序列化后的队列项状态（JSON）
+    data = db.Column(db.Text, nullable=False)
+    created_date = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    job = db.relationship('ProcessJob', backref=db.backref('events', lazy=True, cascade='all, delete-orphan'))
+
+
+class DictationAttempt(db.Model):
+    """听写记录（只追加），由学生端批量上报"""
+    id = db.Column(db.Integer, primary_key=True)
+    content_id = db.Column(db.Integer, db.ForeignKey('content.id'), nullable=False, index=True)
+    chapter_id = db.Column(db.Integer, nullable=False)
+    correct = db.Column(db.Boolean, nullable=False)
+    # 学生端一次听写会话的标识
+    session_id = db.Column(db.String(64))
+    created_date = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+
+class ContentStat(db.Model):
+    """内容项的听写统计，写入听写记录时同步累加，避免查询时聚合全部记录"""
+    # 单独建表而不放在Content上，统计更新不会使章节页面缓存失效
+    content_id = db.Column(db.Integer, db.ForeignKey('content.id'), primary_key=True)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    correct = db.Column(db.Integer, nullable=False, default=0)
+    updated_date = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    content = db.relationship('Content', backref=db.backref('stat', uselist=False, cascade='all, delete-orphan'))
+
+
+# 后台处理队列配置
+PROCESS_MAX_ATTEMPTS = int(os.getenv('PROCESS_MAX_ATTEMPTS', 3))
+PROCESS_POLL_INTERVAL = float(os.getenv('PROCESS_POLL_INTERVAL', 1))
+# 失败重试的等待时间（秒），每次失败后翻倍
+PROCESS_RETRY_BACKOFF = float(os.getenv('PROCESS_RETRY_BACKOFF', 30))
+# worker心跳写入间隔（秒）；超过PROCESS_HEARTBEAT_TIMEOUT没有心跳视为worker已停止（单项处理可能需要几十秒）
+PROCESS_HEARTBEAT_INTERVAL = 10
+PROCESS_HEARTBEAT_TIMEOUT = 90
+
+# 进度事件流：轮询数据库的间隔、心跳间隔和单次连接的最长时间（之后由浏览器自动重连）
+EVENT_STREAM_POLL_INTERVAL = 0.5
+EVENT_STREAM_HEARTBEAT = 15
+EVENT_STREAM_MAX_DURATION = 60
+
+# 听写结果单次上报的最大条数
+DICTATION_BATCH_LIMIT = 200
+
+# 章节导出格式版本，以及导出/导入时每批读取或提交的行数
+EXPORT_FORMAT_VERSION = 1
+EXPORT_BATCH_SIZE = 1000
+IMPORT_BATCH_SIZE = 500
+
+# 页面缓存命中统计先在进程内累计，定期写入数据库
+PAGE_CACHE_STAT_FLUSH_INTERVAL = 30
+_page_cache_counts = {}
+_page_cache_flushed_at = time.time()
+_page_cache_lock = threading.Lock()
+
+# 带指纹的静态资源缓存一年（文件名随内容变化）
+ASSET_MAX_AGE = 365 * 24 * 3600
+_asset_manifest = None
+_build_id = None
+
+
 @login_manager.user_loader
 def load_user(user_id):
     return Admin.query.get(int(user_id))
 
 
+def get_asset_manifest():
+    """读取build_assets.py生成的资源映射，未构建时返回空映射（直接使用源文件）"""
+    global _asset_manifest
+    if _asset_manifest is None:
+        manifest_path = os.path.join(current_app.static_folder, 'dist', 'manifest.json')
+        try:
+            with open(manifest_path, encoding='utf-8') as f:
+                _asset_manifest = json.load(f)
+        except (OSError, ValueError):
+            _asset_manifest = {}
+    return _asset_manifest
+
+
+def get_build_id():
+    """当前部署的构建标识：资源映射和模板内容的哈希，作为页面缓存键的一部分，部署新版本后旧缓存不再命中"""
+    global _build_id
+    if _build_id is None:
+        digest = hashlib.sha256()
+        paths = [os.path.join(current_app.static_folder, 'dist', 'manifest.json')]
+        template_dir = os.path.join(current_app.root_path, current_app.template_folder)
+        for root, dirs, files in os.walk(template_dir):
+            dirs.sort()
+            paths.extend(os.path.join(root, name) for name in sorted(files))
+        for path in paths:
+            try:
+                with open(path, 'rb') as f:
+                    digest.update(path.encode('utf-8'))
+                    digest.update(f.read())
+            except OSError:
+                continue
+        _build_id = digest.hexdigest()[:12]
+    return _build_id
+
+
+@bp.app_url_defaults
+def fingerprint_static_url(endpoint, values):
+    """url_for('static', filename=...) 自动解析为带指纹的资源地址"""
+    if endpoint == 'static' and 'filename' in values:
+        values['filename'] = get_asset_manifest().get(values['filename'], values['filename'])
+
+
 def get_tts_config():
     """获取TTS配置，如果不存在则创建默认配置"""
     config = TTSConfig.query.first()
@@ -185,6 +400,7 @@ def get_baidu_translation(text, from_lang='en', to_lang='zh'):
         }
         
         # 发送请求
+        import requests
         url = 'https://fanyi-api.baidu.com/api/trans/vip/translate'
         response = requests.get(url, params=params, timeout=10)
         
@@ -217,6 +433,7 @@ def get_chinese_translation_fallback(text):
         # TODO: 集成真正的中文翻译API
         
         # 先尝试使用Dictionary API获取英文释义
+        import requests
         url = f"https://api.dictionaryapi.dev/api/v2/entries/en/{text.lower().replace(' ', '%20')}"
         response = requests.get(url, timeout=5)
         
@@ -247,6 +464,7 @@ def get_phonetic(word):
     """获取单词音标"""
     try:
         # 使用免费的音标API
+        import requests
         url = f"https://api.dictionaryapi.dev/api/v2/entries/en/{word.lower()}"
         response = requests.get(url, timeout=5)
         
@@ -308,15 +526,841 @@ def extract_content_items(text):
     return unique_items
 
 
+def normalize_vocabulary_key(text):
+    """词汇去重键：小写并合并空白"""
+    return re.sub(r'\s+', ' ', text.strip().lower())
+
+
+def get_or_create_vocabulary(text):
+    """获取词汇，不存在时获取音标和翻译后创建（只加入会话，由调用方提交）"""
+    key = normalize_vocabulary_key(text)
+    vocabulary = Vocabulary.query.filter_by(key=key).first()
+
+    if vocabulary is None:
+        vocabulary = Vocabulary(text=text, key=key)
+        db.session.add(vocabulary)
+
+    # 已有音标或翻译的词汇直接复用，之前获取失败的重新获取
+    if not vocabulary.phonetic and not vocabulary.translation:
+        vocabulary.phonetic = get_phonetic(text)
+        vocabulary.translation = get_chinese_translation(text)
+
+    return vocabulary
+
+
+def merge_vocabulary(text, translation=None, phonetic=None, vocabulary=None):
+    """获取或创建词汇，并用已有的音标和翻译补全缺失字段，不调用外部API（只加入会话，由调用方提交）"""
+    if vocabulary is None:
+        key = normalize_vocabulary_key(text)
+        vocabulary = Vocabulary.query.filter_by(key=key).first()
+        if vocabulary is None:
+            vocabulary = Vocabulary(text=text, key=key)
+            db.session.add(vocabulary)
+
+    if translation and not vocabulary.translation:
+        vocabulary.translation = translation
+    if phonetic and not vocabulary.phonetic:
+        vocabulary.phonetic = phonetic
+    return vocabulary
+
+
+def build_content_item(chapter_id, text, position=None):
+    """将词汇加入章节，创建内容项（只加入会话，由调用方提交）"""
+    if position is None:
+        last_position = db.session.query(db.func.max(Content.position)).filter_by(chapter_id=chapter_id).scalar()
+        position = 0 if last_position is None else last_position + 1
+
+    content = Content(
+        text=text,
+        vocabulary=get_or_create_vocabulary(text),
+        chapter_id=chapter_id,
+        position=position
+    )
+    db.session.add(content)
+    return content
+
+
+def enqueue_process_job(chapter_id, items):
+    """为章节创建处理任务，每个内容项一条队列记录（由调用方提交）"""
+    job = ProcessJob(chapter_id=chapter_id)
+    for position, text in enumerate(items):
+        job.items.append(ProcessJobItem(chapter_id=chapter_id, position=position, text=text))
+    db.session.add(job)
+    return job
+
+
+def claim_next_job_item():
+    """领取下一个等待处理的队列项，返回None表示队列为空"""
+    while True:
+        item = ProcessJobItem.query.filter(
+            ProcessJobItem.status == 'pending',
+            db.or_(ProcessJobItem.next_attempt_at.is_(None), ProcessJobItem.next_attempt_at <= datetime.utcnow())
+        ).order_by(ProcessJobItem.id).first()
+        if not item:
+            return None
+
+        # 条件更新保证同一项不会被重复领取
+        claimed = ProcessJobItem.query.filter_by(id=item.id, status='pending').update({
+            'status': 'running',
+            'attempts': ProcessJobItem.attempts + 1,
+            'updated_date': datetime.utcnow()
+        }, synchronize_session=False)
+
+        if claimed:
+            db.session.refresh(item)
+            add_job_event(item)
+            db.session.commit()
+            return item
+
+        db.session.commit()
+
+
+def run_job_item(item):
+    """处理单个队列项；已存在的内容项直接标记完成，保证重启后可安全续跑
+
+    翻译和音标接口失败时只返回空值，两者都没有获取到时按失败重试；
+    最后一次仍然没有获取到时保留内容项，并把队列项标记为失败，记录缺失的数据。
+    """
+    existing = Content.query.filter_by(chapter_id=item.chapter_id, text=item.text).first()
+
+    try:
+        if existing:
+            content = existing
+            # 之前获取失败的词汇重新获取音标和翻译
+            if not content.phonetic and not content.translation:
+                content.vocabulary = get_or_create_vocabulary(item.text)
+        else:
+            content = build_content_item(item.chapter_id, item.text, item.position)
+        db.session.flush()
+
+        missing = not content.phonetic and not content.translation
+        if missing and item.attempts < PROCESS_MAX_ATTEMPTS:
+            raise RuntimeError('未获取到音标和翻译')
+
+        item.content_id = content.id
+        item.status = 'failed' if missing else 'done'
+        item.error = '未获取到音标和翻译' if missing else None
+        item.next_attempt_at = None
+        item.finished_date = datetime.utcnow()
+        add_job_event(item, content)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        print(f"队列项处理失败 '{item.text}': {str(e)}")
+
+        item = db.session.get(ProcessJobItem, item.id)
+        item.error = str(e)[:500]
+        if item.attempts >= PROCESS_MAX_ATTEMPTS:
+            item.status = 'failed'
+            item.finished_date = datetime.utcnow()
+        else:
+            item.status = 'pending'
+            item.next_attempt_at = datetime.utcnow() + timedelta(
+                seconds=PROCESS_RETRY_BACKOFF * 2 ** (item.attempts - 1))
+        add_job_event(item)
+        db.session.commit()
+
+    return item
+
+
+def requeue_job_items(items, reset_attempts=True):
+    """把队列项重新放回等待状态并记录事件（由调用方提交）"""
+    for item in items:
+        item.status = 'pending'
+        item.finished_date = None
+        item.next_attempt_at = None
+        if reset_attempts:
+            item.attempts = 0
+        add_job_event(item)
+    return len(items)
+
+
+def add_job_event(item, content=None):
+    """记录队列项的状态变化，与状态更新在同一事务中提交"""
+    data = json.dumps(serialize_job_item(item, content), ensure_ascii=False, separators=(',', ':'))
+    db.session.add(ProcessJobEvent(job_id=item.job_id, item_id=item.id, data=data))
+
+
+def serialize_job_item(item, content=None):
+    """队列项转为接口返回的字典"""
+    return {
+        'id': item.id,
+        'index': item.position,
+        'text': item.text,
+        'status': item.status,
+        'attempts': item.attempts,
+        'error': item.error,
+        'phonetic': content.phonetic if content else None,
+        'translation': content.translation if content else None
+    }
+
+
+def get_queue_stats():
+    """统计队列深度和处理吞吐量"""
+    counts = dict(
+        db.session.query(ProcessJobItem.status, db.func.count(ProcessJobItem.id))
+        .group_by(ProcessJobItem.status).all()
+    )
+
+    now = datetime.utcnow()
+    done_last_5min = ProcessJobItem.query.filter(
+        ProcessJobItem.status == 'done',
+        ProcessJobItem.finished_date >= now - timedelta(minutes=5)
+    ).count()
+    done_last_hour = ProcessJobItem.query.filter(
+        ProcessJobItem.status == 'done',
+        ProcessJobItem.finished_date >= now - timedelta(hours=1)
+    ).count()
+
+    return {
+        'pending': counts.get('pending', 0),
+        'running': counts.get('running', 0),
+        'done': counts.get('done', 0),
+        'failed': counts.get('failed', 0),
+        'done_last_5min': done_last_5min,
+        'done_last_hour': done_last_hour,
+        'per_minute': round(done_last_5min / 5, 1)
+    }
+
+
+def record_worker_heartbeat(started=False, last_claim=None):
+    """写入worker心跳（由调用方在空闲时调用，自行提交）"""
+    now = datetime.utcnow()
+    heartbeat = db.session.get(WorkerHeartbeat, 'process-worker') or WorkerHeartbeat(name='process-worker')
+    if started:
+        heartbeat.pid = os.getpid()
+        heartbeat.started_date = now
+    heartbeat.last_poll = now
+    if last_claim:
+        heartbeat.last_claim = last_claim
+    db.session.add(heartbeat)
+    db.session.commit()
+
+
+def get_worker_status():
+    """worker运行状态：最近一次心跳超过超时时间或从未启动时视为已停止"""
+    heartbeat = db.session.get(WorkerHeartbeat, 'process-worker')
+    if heartbeat is None or heartbeat.last_poll is None:
+        return {'alive': False, 'heartbeat': None, 'poll_seconds_ago': None, 'claim_seconds_ago': None}
+
+    now = datetime.utcnow()
+    poll_seconds_ago = int((now - heartbeat.last_poll).total_seconds())
+    return {
+        'alive': poll_seconds_ago <= PROCESS_HEARTBEAT_TIMEOUT,
+        'heartbeat': heartbeat,
+        'poll_seconds_ago': poll_seconds_ago,
+        'claim_seconds_ago': int((now - heartbeat.last_claim).total_seconds()) if heartbeat.last_claim else None
+    }
+
+
+def ensure_schema():
+    """创建缺失的表，并为已有表补充新增的列（create_all不会修改已有表）"""
+    db.create_all()
+
+    columns = {column['name'] for column in db.inspect(db.engine).get_columns('content')}
+    if 'vocabulary_id' not in columns:
+        db.session.execute(db.text("ALTER TABLE content ADD COLUMN vocabulary_id INTEGER REFERENCES vocabulary(id)"))
+        print("内容表已添加vocabulary_id列")
+    if 'position' not in columns:
+        db.session.execute(db.text("ALTER TABLE content ADD COLUMN position INTEGER NOT NULL DEFAULT 0"))
+        print("内容表已添加position列")
+    db.session.execute(db.text("CREATE INDEX IF NOT EXISTS ix_content_vocabulary_id ON content (vocabulary_id)"))
+
+    columns = {column['name'] for column in db.inspect(db.engine).get_columns('process_job_item')}
+    if 'next_attempt_at' not in columns:
+        db.session.execute(db.text("ALTER TABLE process_job_item ADD COLUMN next_attempt_at DATETIME"))
+        print("队列表已添加next_attempt_at列")
+
+    columns = {column['name'] for column in db.inspect(db.engine).get_columns('chapter')}
+    if 'content_version' not in columns:
+        db.session.execute(db.text("ALTER TABLE chapter ADD COLUMN content_version INTEGER NOT NULL DEFAULT 0"))
+        print("章节表已添加content_version列")
+    db.session.commit()
+
+    if db.engine.dialect.name == 'sqlite':
+        ensure_search_index()
+
+
+# 全文索引的列：内容项的文本、翻译和音标，rowid即content.id
+CONTENT_FTS_ROW_SQL = """
+    SELECT {row}.id, {row}.text, COALESCE(v.translation, {row}.translation), COALESCE(v.phonetic, {row}.phonetic)
+    FROM (SELECT 1) LEFT JOIN vocabulary v ON v.id = {row}.vocabulary_id
+"""
+
+CONTENT_FTS_TRIGGERS = [
+    f"""CREATE TRIGGER IF NOT EXISTS content_fts_insert AFTER INSERT ON content BEGIN
+        INSERT INTO content_fts (rowid, text, translation, phonetic) {CONTENT_FTS_ROW_SQL.format(row='new')};
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS content_fts_delete AFTER DELETE ON content BEGIN
+        DELETE FROM content_fts WHERE rowid = old.id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS content_fts_update
+    AFTER UPDATE OF text, translation, phonetic, vocabulary_id ON content BEGIN
+        DELETE FROM content_fts WHERE rowid = old.id;
+        INSERT INTO content_fts (rowid, text, translation, phonetic) {CONTENT_FTS_ROW_SQL.format(row='new')};
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS vocabulary_fts_update AFTER UPDATE OF translation, phonetic ON vocabulary BEGIN
+        DELETE FROM content_fts WHERE rowid IN (SELECT id FROM content WHERE vocabulary_id = new.id);
+        INSERT INTO content_fts (rowid, text, translation, phonetic)
+        SELECT id, text, new.translation, new.phonetic FROM content WHERE vocabulary_id = new.id;
+    END""",
+]
+
+def substring_index_triggers(table, wrap='{}'):
+    """翻译和音标子串索引的同步触发器，wrap用于在写入索引前转换列值"""
+    translation = wrap.format('COALESCE(v.translation, new.translation)')
+    phonetic = wrap.format('COALESCE(v.phonetic, new.phonetic)')
+    row_sql = f"""
+        SELECT new.id, {translation}, {phonetic}
+        FROM (SELECT 1) LEFT JOIN vocabulary v ON v.id = new.vocabulary_id
+    """
+    return [
+        f"""CREATE TRIGGER IF NOT EXISTS {table}_insert AFTER INSERT ON content BEGIN
+            INSERT INTO {table} (rowid, translation, phonetic) {row_sql};
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {table}_delete AFTER DELETE ON content BEGIN
+            DELETE FROM {table} WHERE rowid = old.id;
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {table}_update
+        AFTER UPDATE OF translation, phonetic, vocabulary_id ON content BEGIN
+            DELETE FROM {table} WHERE rowid = old.id;
+            INSERT INTO {table} (rowid, translation, phonetic) {row_sql};
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS vocabulary_{table.split('_', 1)[1]}_update
+        AFTER UPDATE OF translation, phonetic ON vocabulary BEGIN
+            DELETE FROM {table} WHERE rowid IN (SELECT id FROM content WHERE vocabulary_id = new.id);
+            INSERT INTO {table} (rowid, translation, phonetic)
+            SELECT id, {wrap.format('new.translation')}, {wrap.format('new.phonetic')}
+            FROM content WHERE vocabulary_id = new.id;
+        END""",
+    ]
+
+
+def split_search_chars(text):
+    """把文本拆成以空格分隔的单个字符，content_chars索引按字建立，用于1~2个字符的子串查询"""
+    if not text:
+        return text
+    return ' '.join(char for char in text if not char.isspace())
+
+
+def ensure_search_index():
+    """创建SQLite FTS5全文索引和同步触发器，首次创建时导入已有内容项"""
+    create_fts_table(
+        'content_fts',
+        "CREATE VIRTUAL TABLE content_fts USING fts5(text, translation, phonetic, prefix='2 3')",
+        "INSERT INTO content_fts (rowid, text, translation, phonetic) "
+        "SELECT c.id, c.text, COALESCE(v.translation, c.translation), COALESCE(v.phonetic, c.phonetic) "
+        "FROM content c LEFT JOIN vocabulary v ON v.id = c.vocabulary_id",
+        CONTENT_FTS_TRIGGERS
+    )
+    # 中文翻译没有空格分词，音标中带有重音符号，另建索引支持任意位置的子串匹配：
+    # 3个字符以上的查询使用trigram分词（需要SQLite 3.34及以上），更短的查询使用按字建立的索引
+    create_fts_table(
+        'content_trigram',
+        "CREATE VIRTUAL TABLE content_trigram USING fts5(translation, phonetic, tokenize='trigram')",
+        "INSERT INTO content_trigram (rowid, translation, phonetic) "
+        "SELECT c.id, COALESCE(v.translation, c.translation), COALESCE(v.phonetic, c.phonetic) "
+        "FROM content c LEFT JOIN vocabulary v ON v.id = c.vocabulary_id",
+        substring_index_triggers('content_trigram')
+    )
+    create_fts_table(
+        'content_chars',
+        "CREATE VIRTUAL TABLE content_chars USING fts5(translation, phonetic)",
+        "INSERT INTO content_chars (rowid, translation, phonetic) "
+        "SELECT c.id, split_search_chars(COALESCE(v.translation, c.translation)), "
+        "split_search_chars(COALESCE(v.phonetic, c.phonetic)) "
+        "FROM content c LEFT JOIN vocabulary v ON v.id = c.vocabulary_id",
+        substring_index_triggers('content_chars', 'split_search_chars({})')
+    )
+
+
+def create_fts_table(name, create_sql, fill_sql, triggers):
+    """创建一个全文索引表并导入已有数据，内容项和词汇的所有写入都由触发器同步到索引"""
+    exists = db.session.execute(db.text(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {'name': name}).first()
+
+    try:
+        if not exists:
+            db.session.execute(db.text(create_sql))
+            db.session.execute(db.text(fill_sql))
+            print(f"全文索引{name}创建成功")
+
+        for trigger in triggers:
+            db.session.execute(db.text(trigger))
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        print(f"创建全文索引{name}失败，搜索将使用LIKE查询: {e}")
+
+
+def build_fts_query(query):
+    """把用户输入转为FTS5查询：每个词按前缀匹配，多个词同时满足"""
+    terms = re.findall(r'[^\s"]+', query)
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def search_contents(query, limit=20):
+    """搜索内容项，优先使用全文索引按相关度排序，索引不可用时退回LIKE查询
+
+    英文文本按词前缀匹配；翻译和音标按子串匹配（如“果”匹配“苹果”，“æp”匹配“/ˈæpəl/”），排在文本匹配之后。
+    """
+    fts_query = build_fts_query(query)
+    if not fts_query:
+        return []
+
+    # 子串查询：3个字符以上用trigram索引，更短的在按字建立的索引中按相邻字符的短语匹配
+    substring = query.strip()
+    if len(substring) >= 3:
+        substring_table = 'content_trigram'
+        substring_query = '"' + substring.replace('"', '""') + '"'
+    else:
+        substring_table = 'content_chars'
+        substring_query = '"' + split_search_chars(substring.replace('"', '')) + '"'
+
+    try:
+        # text、translation、phonetic的权重依次降低；bm25越小越相关，子串匹配的排序值为0排在文本匹配之后。
+        # 两类匹配各自只取前limit条，合并后的前limit条不变
+        rows = db.session.execute(db.text(f"""
+            SELECT c.id, c.text, COALESCE(v.translation, c.translation), COALESCE(v.phonetic, c.phonetic),
+                   c.chapter_id, ch.name
+            FROM (
+                SELECT * FROM (
+                    SELECT rowid AS id, bm25(content_fts, 10.0, 5.0, 1.0) AS rank
+                    FROM content_fts WHERE content_fts MATCH :query
+                    ORDER BY rank LIMIT :limit
+                )
+                UNION ALL
+                SELECT * FROM (
+                    SELECT rowid AS id, 0 AS rank
+                    FROM {substring_table} WHERE {substring_table} MATCH :substring
+                    ORDER BY rowid LIMIT :limit
+                )
+            ) matches
+            JOIN content c ON c.id = matches.id
+            JOIN chapter ch ON ch.id = c.chapter_id
+            LEFT JOIN vocabulary v ON v.id = c.vocabulary_id
+            GROUP BY c.id
+            ORDER BY MIN(matches.rank), c.id
+            LIMIT :limit
+        """), {'query': fts_query, 'substring': substring_query, 'limit': limit}).all()
+    except Exception:
+        db.session.rollback()
+        pattern = f'%{substring}%'
+        contents = (Content.query.outerjoin(Vocabulary)
+                    .filter(db.or_(Content.text.ilike(pattern), Vocabulary.translation.ilike(pattern),
+                                   Vocabulary.phonetic.ilike(pattern)))
+                    .order_by(Content.id).limit(limit).all())
+        rows = [(c.id, c.text, c.translation, c.phonetic, c.chapter_id, c.chapter.name) for c in contents]
+
+    return [{
+        'content_id': row[0],
+        'text': row[1],
+        'translation': row[2],
+        'phonetic': row[3],
+        'chapter_id': row[4],
+        'chapter_name': row[5]
+    } for row in rows]
+
+
+def migrate_to_vocabulary(batch_size=500):
+    """把旧的Content、Word、Phrase数据合并到词汇表，返回(词汇新增数, 内容项迁移数, 旧数据合并数)"""
+    # 每批只查询本批用到的词汇，不加载整个词汇表；没有需要迁移的数据时只执行几次空查询
+    vocabularies = {}
+    created = 0
+
+    def load_vocabularies(texts):
+        keys = {normalize_vocabulary_key(text) for text in texts}
+        vocabularies.clear()
+        if keys:
+            vocabularies.update((v.key, v) for v in Vocabulary.query.filter(Vocabulary.key.in_(keys)))
+
+    def vocabulary_for(text, translation, phonetic):
+        nonlocal created
+        key = normalize_vocabulary_key(text)
+        vocabulary = vocabularies.get(key)
+        if vocabulary is None:
+            vocabulary = Vocabulary(text=text, key=key)
+            db.session.add(vocabulary)
+            vocabularies[key] = vocabulary
+            created += 1
+        # 补全词汇表中缺失的音标和翻译
+        return merge_vocabulary(text, translation, phonetic, vocabulary)
+
+    # 1. 已有内容项关联到词汇，并清空重复存储的音标和翻译
+    migrated = 0
+    while True:
+        batch = Content.query.filter(Content.vocabulary_id.is_(None)).order_by(Content.id).limit(batch_size).all()
+        if not batch:
+            break
+        load_vocabularies(content.text for content in batch)
+        for content in batch:
+            content.vocabulary = vocabulary_for(content.text, content.legacy_translation, content.legacy_phonetic)
+            content.legacy_translation = None
+            content.legacy_phonetic = None
+        db.session.commit()
+        migrated += len(batch)
+
+    # 2. 旧的Word/Phrase转为内容项后删除，章节中已存在的词汇不重复添加
+    folded = 0
+    for model, text_attr in ((Word, 'word'), (Phrase, 'phrase')):
+        while True:
+            batch = model.query.order_by(model.id).limit(batch_size).all()
+            if not batch:
+                break
+            load_vocabularies(getattr(row, text_attr).strip() for row in batch)
+            for row in batch:
+                text = getattr(row, text_attr).strip()
+                if text:
+                    vocabulary = vocabulary_for(text, row.translation, row.phonetic)
+                    db.session.flush()
+                    exists = Content.query.filter_by(chapter_id=row.chapter_id, vocabulary_id=vocabulary.id).first()
+                    if not exists:
+                        last_position = db.session.query(db.func.max(Content.position)).filter_by(
+                            chapter_id=row.chapter_id).scalar()
+                        db.session.add(Content(
+                            text=text,
+                            vocabulary=vocabulary,
+                            chapter_id=row.chapter_id,
+                            position=0 if last_position is None else last_position + 1
+                        ))
+                db.session.delete(row)
+                folded += 1
+            db.session.commit()
+
+    return created, migrated, folded
+
+
+def iter_chapter_export(chapter_ids=None):
+    """逐行生成章节导出的JSONL：先是格式信息，然后每个章节一行，后面跟着它的内容项
+
+    章节和内容项都分批读取，只查询需要的列，内存占用与章节数量和内容量无关。
+    """
+    yield json.dumps({'type': 'meta', 'version': EXPORT_FORMAT_VERSION,
+                      'exported_date': datetime.utcnow().isoformat()}) + '\n'
+
+    content_query = (
+        db.select(Content.position, Content.text,
+                  db.func.coalesce(Vocabulary.translation, Content.legacy_translation),
+                  db.func.coalesce(Vocabulary.phonetic, Content.legacy_phonetic))
+        .outerjoin(Vocabulary, Content.vocabulary_id == Vocabulary.id)
+        .order_by(Content.position, Content.id)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+
+    last_id = 0
+    while True:
+        query = db.select(Chapter.id, Chapter.name, Chapter.created_date).where(Chapter.id > last_id)
+        if chapter_ids:
+            query = query.where(Chapter.id.in_(chapter_ids))
+        chapters = db.session.execute(query.order_by(Chapter.id).limit(EXPORT_BATCH_SIZE)).all()
+        if not chapters:
+            break
+
+        for chapter_id, name, created_date in chapters:
+            yield json.dumps({'type': 'chapter', 'id': chapter_id, 'name': name,
+                              'created_date': created_date.isoformat()}, ensure_ascii=False) + '\n'
+            rows = db.session.execute(content_query.where(Content.chapter_id == chapter_id))
+            for position, text, translation, phonetic in rows:
+                yield json.dumps({'type': 'content', 'chapter_id': chapter_id, 'position': position, 'text': text,
+                                  'translation': translation, 'phonetic': phonetic}, ensure_ascii=False) + '\n'
+        last_id = chapters[-1][0]
+
+        # 每批章节结束后释放读事务，导出大量数据时不妨碍WAL检查点
+        db.session.rollback()
+
+
+def import_chapter_lines(lines, after_chapter_id=None, progress=None):
+    """从JSONL逐行导入章节和内容项，统计写入progress：章节数、内容项数、跳过行数和最后完成的源章节ID
+
+    导入的章节总是新建；音标和翻译直接写入词汇表（已有的不覆盖），不调用翻译和音标接口。
+    每个章节连同它的内容项在一个事务中提交，中途失败时只回滚未完成的章节；导出文件按章节ID升序，
+    传入after_chapter_id可跳过已导入的章节继续导入。格式不正确的行计入跳过行数。
+    """
+    progress = progress if progress is not None else {}
+    progress.update(chapters=0, items=0, skipped=0, last_chapter_id=after_chapter_id)
+    # 正在导入的章节：(源章节ID, 新章节ID, 已加入的内容项数)
+    current = None
+
+    def finish_chapter():
+        if current:
+            db.session.commit()
+            progress['chapters'] += 1
+            progress['items'] += current[2]
+            progress['last_chapter_id'] = current[0]
+
+    try:
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                record = None
+            if not isinstance(record, dict):
+                progress['skipped'] += 1
+                continue
+
+            record_type = record.get('type')
+            if record_type == 'meta':
+                version = record.get('version')
+                if not isinstance(version, int) or version > EXPORT_FORMAT_VERSION:
+                    raise ValueError(f'不支持的导出格式版本: {version}')
+
+            elif record_type == 'chapter':
+                finish_chapter()
+                current = None
+                source_id, name = record.get('id'), record.get('name')
+                if not isinstance(source_id, int) or not isinstance(name, str) or not name.strip():
+                    progress['skipped'] += 1
+                    continue
+                if after_chapter_id is not None and source_id <= after_chapter_id:
+                    continue
+
+                chapter = Chapter(name=name.strip())
+                try:
+                    chapter.created_date = datetime.fromisoformat(record.get('created_date'))
+                except (TypeError, ValueError):
+                    pass
+                db.session.add(chapter)
+                db.session.flush()
+                current = (source_id, chapter.id, 0)
+
+            elif record_type == 'content':
+                source_id, text = record.get('chapter_id'), record.get('text')
+                if after_chapter_id is not None and isinstance(source_id, int) and source_id <= after_chapter_id:
+                    continue
+                if not current or source_id != current[0] or not isinstance(text, str) or not text.strip():
+                    progress['skipped'] += 1
+                    continue
+
+                translation, phonetic, position = record.get('translation'), record.get('phonetic'), record.get('position')
+                text = text.strip()
+                db.session.add(Content(
+                    text=text,
+                    vocabulary=merge_vocabulary(text,
+                                                translation if isinstance(translation, str) else None,
+                                                phonetic if isinstance(phonetic, str) else None),
+                    chapter_id=current[1],
+                    position=position if isinstance(position, int) else 0
+                ))
+                current = (current[0], current[1], current[2] + 1)
+                # 大章节分批写入数据库，已写入的对象不再占用会话内存
+                if current[2] % IMPORT_BATCH_SIZE == 0:
+                    db.session.flush()
+
+            else:
+                progress['skipped'] += 1
+
+        finish_chapter()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    return progress
+
+
+def backup_database(path):
+    """使用SQLite在线备份API把数据库复制到path，返回备份文件大小，备份期间应用可以继续读写"""
+    url = db.engine.url
+    if url.get_backend_name() != 'sqlite' or not url.database or url.database == ':memory:':
+        raise ValueError('只支持备份文件型SQLite数据库')
+
+    # 以只读方式打开源数据库，路径错误时报错，而不是新建一个空数据库
+    source = sqlite3.connect(f'file:{quote(url.database)}?mode=ro', uri=True)
+
+    # 先写入同目录的临时文件，校验通过后再替换，避免留下不完整的备份
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(suffix='.db', dir=directory)
+    os.close(fd)
+    target = sqlite3.connect(temp_path)
+    try:
+        # 一次复制全部页：WAL模式下整个备份在同一个读快照内完成，不阻塞写入，也不会因并发写入而重新开始
+        source.backup(target)
+        # 备份文件改回普通日志模式，单个文件即可完整恢复
+        target.execute('PRAGMA journal_mode=DELETE')
+        check = target.execute('PRAGMA quick_check').fetchone()[0]
+    except sqlite3.Error as e:
+        check = str(e)
+    finally:
+        target.close()
+        source.close()
+
+    if check != 'ok':
+        os.remove(temp_path)
+        raise RuntimeError(check)
+
+    os.replace(temp_path, path)
+    return os.path.getsize(path)
+
+
+def record_page_cache(name, hit):
+    """累计页面缓存命中/未命中次数，超过刷新间隔时写入数据库"""
+    with _page_cache_lock:
+        counts = _page_cache_counts.setdefault(name, [0, 0])
+        counts[0 if hit else 1] += 1
+        due = time.time() - _page_cache_flushed_at >= PAGE_CACHE_STAT_FLUSH_INTERVAL
+    if due:
+        flush_page_cache_stats()
+
+
+def flush_page_cache_stats():
+    """把进程内累计的缓存统计写入数据库"""
+    global _page_cache_flushed_at
+    with _page_cache_lock:
+        pending = {name: counts for name, counts in _page_cache_counts.items() if any(counts)}
+        _page_cache_counts.clear()
+        _page_cache_flushed_at = time.time()
+
+    try:
+        for name, (hits, misses) in pending.items():
+            stat = db.session.get(CacheStat, name)
+            if stat is None:
+                stat = CacheStat(name=name, hits=0, misses=0)
+                db.session.add(stat)
+            stat.hits += hits
+            stat.misses += misses
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        print(f"写入页面缓存统计失败: {str(e)}")
+
+
+def get_page_cache_stats():
+    """各页面的缓存命中统计（所有worker进程汇总）"""
+    flush_page_cache_stats()
+    stats = []
+    for stat in CacheStat.query.order_by(CacheStat.name).all():
+        total = stat.hits + stat.misses
+        stats.append({
+            'name': stat.name,
+            'hits': stat.hits,
+            'misses': stat.misses,
+            'hit_ratio': round(stat.hits * 100 / total, 1) if total else 0
+        })
+    return stats
+
+
+def cached_chapter_page(page, chapter_id, render):
+    """学生访问章节页面时复用缓存的渲染结果，缓存按(页面, 章节, 构建标识, 内容版本)命中"""
+    # 管理员页面带有登录状态，有闪现消息时页面内容也不同，这两种情况不缓存
+    if current_user.is_authenticated or session.get('_flashes'):
+        return render(chapter_id)
+
+    cache_key = f'{page}:{chapter_id}:{get_build_id()}'
+    row = db.session.execute(db.text("""
+        SELECT c.content_version, p.body
+        FROM chapter c LEFT JOIN page_cache p ON p.cache_key = :cache_key AND p.version = c.content_version
+        WHERE c.id = :chapter_id
+    """), {'cache_key': cache_key, 'chapter_id': chapter_id}).first()
+
+    if row is None:
+        abort(404)
+
+    version, body = row
+    if body is not None:
+        record_page_cache(page, True)
+        return Response(body, mimetype='text/html', headers={'X-Cache': 'HIT'})
+
+    body = render(chapter_id)
+    try:
+        db.session.merge(PageCache(cache_key=cache_key, chapter_id=chapter_id, version=version, body=body))
+        db.session.commit()
+    except Exception:
+        # 其他worker同时写入同一缓存，直接使用本次渲染结果
+        db.session.rollback()
+
+    record_page_cache(page, False)
+    return Response(body, mimetype='text/html', headers={'X-Cache': 'MISS'})
+
+
+def record_dictation_attempts(attempts, session_id=None):
+    """批量写入听写记录并累加内容项统计，返回写入条数"""
+    content_ids = set()
+    for attempt in attempts:
+        try:
+            content_ids.add(int(attempt.get('content_id')))
+        except (TypeError, ValueError, AttributeError):
+            continue
+    if not content_ids:
+        return 0
+
+    # 只记录仍然存在的内容项
+    chapters = dict(db.session.query(Content.id, Content.chapter_id).filter(Content.id.in_(content_ids)).all())
+
+    now = datetime.utcnow()
+    rows = []
+    totals = {}
+    for attempt in attempts:
+        try:
+            content_id = int(attempt.get('content_id'))
+        except (TypeError, ValueError, AttributeError):
+            continue
+        if content_id not in chapters:
+            continue
+
+        correct = bool(attempt.get('correct'))
+        rows.append({
+            'content_id': content_id,
+            'chapter_id': chapters[content_id],
+            'correct': correct,
+            'session_id': session_id,
+            'created_date': now
+        })
+        total = totals.setdefault(content_id, [0, 0])
+        total[0] += 1
+        total[1] += int(correct)
+
+    if not rows:
+        return 0
+
+    # 一个事务内批量插入记录，并用upsert累加统计
+    db.session.execute(DictationAttempt.__table__.insert(), rows)
+    db.session.execute(db.text("""
+        INSERT INTO content_stat (content_id, attempts, correct, updated_date)
+        VALUES (:content_id, :attempts, :correct, :updated_date)
+        ON CONFLICT (content_id) DO UPDATE SET
+            attempts = content_stat.attempts + excluded.attempts,
+            correct = content_stat.correct + excluded.correct,
+            updated_date = excluded.updated_date
+    """), [{'content_id': content_id, 'attempts': total[0], 'correct': total[1], 'updated_date': now}
+           for content_id, total in totals.items()])
+    db.session.commit()
+    return len(rows)
+
+
+def get_hardest_contents(chapter_id=None, min_attempts=3, limit=50):
+    """正确率最低的内容项"""
+    accuracy = ContentStat.correct * 1.0 / ContentStat.attempts
+    query = (db.session.query(ContentStat, Content, Chapter.name)
+             .join(Content, Content.id == ContentStat.content_id)
+             .join(Chapter, Chapter.id == Content.chapter_id)
+             .filter(ContentStat.attempts >= min_attempts))
+    if chapter_id:
+        query = query.filter(Content.chapter_id == chapter_id)
+
+    return [{
+        'content_id': content.id,
+        'text': content.text,
+        'translation': content.translation,
+        'chapter_id': content.chapter_id,
+        'chapter_name': chapter_name,
+        'attempts': stat.attempts,
+        'correct': stat.correct,
+        'accuracy': round(stat.correct * 100 / stat.attempts, 1)
+    } for stat, content, chapter_name in query.order_by(accuracy, ContentStat.attempts.desc()).limit(limit).all()]
+
+
 # 路由
-@app.route('/')
+@bp.route('/')
 def index():
     """学习端首页"""
     chapters = Chapter.query.order_by(Chapter.created_date.desc()).all()
     return render_template('index.html', chapters=chapters)
 
 
-@app.route('/admin/login', methods=['GET', 'POST'])
+@bp.route('/admin/login', methods=['GET', 'POST'])
 def admin_login():
     """管理端登录"""
     if request.method == 'POST':
@@ -330,29 +1374,29 @@ def admin_login():
                 db.session.commit()
 
             login_user(admin)
-            return redirect(url_for('admin_dashboard'))
+            return redirect(url_for('main.admin_dashboard'))
         else:
             flash('认证码错误', 'error')
 
     return render_template('admin_login.html')
 
 
-@app.route('/admin/logout')
+@bp.route('/admin/logout')
 @login_required
 def admin_logout():
     logout_user()
-    return redirect(url_for('index'))
+    return redirect(url_for('main.index'))
 
 
-@app.route('/admin')
+@bp.route('/admin')
 @login_required
 def admin_dashboard():
     """管理端仪表板"""
     chapters = Chapter.query.order_by(Chapter.created_date.desc()).all()
-    return render_template('admin_dashboard.html', chapters=chapters)
+    return render_template('admin_dashboard.html', chapters=chapters, cache_stats=get_page_cache_stats())
 
 
-@app.route('/admin/chapter/add', methods=['GET', 'POST'])
+@bp.route('/admin/chapter/add', methods=['GET', 'POST'])
 @login_required
 def add_chapter():
     """添加章节 - 第一步：预览分割"""
@@ -370,7 +1414,7 @@ def add_chapter():
                 # 存储在session中用于下一步确认
                 session['chapter_name'] = name
                 session['content_items'] = items
-                return redirect(url_for('preview_content_split'))
+                return redirect(url_for('main.preview_content_split'))
             else:
                 flash('未能从文本中提取有效内容，请检查文本格式', 'warning')
         else:
@@ -379,12 +1423,12 @@ def add_chapter():
             db.session.add(chapter)
             db.session.commit()
             flash(f'空章节 "{name}" 创建成功！', 'success')
-            return redirect(url_for('admin_dashboard'))
+            return redirect(url_for('main.admin_dashboard'))
 
     return render_template('add_chapter.html')
 
 
-@app.route('/admin/chapter/preview-split')
+@bp.route('/admin/chapter/preview-split')
 @login_required
 def preview_content_split():
     """预览内容分割结果"""
@@ -393,14 +1437,14 @@ def preview_content_split():
     
     if not chapter_name or not content_items:
         flash('会话已过期，请重新提交', 'error')
-        return redirect(url_for('add_chapter'))
+        return redirect(url_for('main.add_chapter'))
     
     return render_template('preview_split.html', 
                          chapter_name=chapter_name, 
                          content_items=content_items)
 
 
-@app.route('/admin/chapter/confirm-split', methods=['POST'])
+@bp.route('/admin/chapter/confirm-split', methods=['POST'])
 @login_required
 def confirm_content_split():
     """确认分割并创建章节"""
@@ -409,7 +1453,7 @@ def confirm_content_split():
     
     if not chapter_name or not content_items:
         flash('会话已过期，请重新提交', 'error')
-        return redirect(url_for('add_chapter'))
+        return redirect(url_for('main.add_chapter'))
     
     # 获取用户修改后的内容
     confirmed_items = request.form.getlist('content_items')
@@ -417,12 +1461,14 @@ def confirm_content_split():
     
     if not confirmed_items:
         flash('没有有效的内容项目', 'warning')
-        return redirect(url_for('preview_content_split'))
+        return redirect(url_for('main.preview_content_split'))
     
     try:
-        # 创建章节
+        # 创建章节，并把内容项写入后台处理队列
         chapter = Chapter(name=chapter_name)
         db.session.add(chapter)
+        db.session.flush()
+        job = enqueue_process_job(chapter.id, confirmed_items)
         db.session.commit()
         
         # 清除session
@@ -431,33 +1477,38 @@ def confirm_content_split():
         
         flash(f'章节 "{chapter_name}" 创建成功！正在后台获取音标和翻译...', 'success')
         
-        # 异步处理音标和翻译
-        return redirect(url_for('process_content_async', chapter_id=chapter.id, items=','.join(confirmed_items)))
+        # 由后台worker处理音标和翻译，页面只展示进度
+        return redirect(url_for('main.process_content_async', chapter_id=chapter.id, job_id=job.id))
         
     except Exception as e:
         db.session.rollback()
         flash(f'创建章节失败: {str(e)}', 'error')
-        return redirect(url_for('preview_content_split'))
+        return redirect(url_for('main.preview_content_split'))
 
 
-@app.route('/admin/chapter/<int:chapter_id>/process-content')
+@bp.route('/admin/chapter/<int:chapter_id>/process-content')
 @login_required
 def process_content_async(chapter_id):
-    """异步处理内容，获取音标和翻译"""
+    """展示后台处理进度，获取音标和翻译"""
     chapter = Chapter.query.get_or_404(chapter_id)
-    items_str = request.args.get('items', '')
-    items = [item.strip() for item in items_str.split(',') if item.strip()]
+    job_id = request.args.get('job_id', type=int)
+    
+    query = ProcessJob.query.filter_by(chapter_id=chapter_id)
+    if job_id:
+        query = query.filter_by(id=job_id)
+    job = query.order_by(ProcessJob.id.desc()).first()
     
-    if not items:
+    if not job or not job.items:
         flash('没有内容需要处理', 'warning')
-        return redirect(url_for('admin_chapter_detail', chapter_id=chapter_id))
+        return redirect(url_for('main.admin_chapter_detail', chapter_id=chapter_id))
     
     return render_template('process_loading.html', 
                          chapter=chapter, 
-                         items=items)
+                         job=job,
+                         items=job.items)
 
 
-@app.route('/api/process-content-item', methods=['POST'])
+@bp.route('/api/process-content-item', methods=['POST'])
 @login_required
 def process_content_item():
     """处理单个内容项，获取音标和翻译"""
@@ -471,24 +1522,14 @@ def process_content_item():
     try:
         chapter = Chapter.query.get_or_404(chapter_id)
         
-        # 获取音标和翻译
-        phonetic = get_phonetic(text)
-        translation = get_chinese_translation(text)
-        
-        # 创建内容项
-        content = Content(
-            text=text,
-            phonetic=phonetic,
-            translation=translation,
-            chapter_id=chapter_id
-        )
-        db.session.add(content)
+        # 获取音标和翻译并创建内容项
+        content = build_content_item(chapter_id, text)
         db.session.commit()
         
         return jsonify({
             'success': True,
-            'phonetic': phonetic,
-            'translation': translation
+            'phonetic': content.phonetic,
+            'translation': content.translation
         })
         
     except Exception as e:
@@ -496,7 +1537,133 @@ def process_content_item():
         return jsonify({'success': False, 'error': str(e)})
 
 
-@app.route('/admin/chapter/<int:chapter_id>')
+@bp.route('/api/process-jobs/<int:job_id>')
+@login_required
+def process_job_status(job_id):
+    """查询处理任务中每个内容项的状态"""
+    job = ProcessJob.query.get_or_404(job_id)
+    
+    content_ids = [item.content_id for item in job.items if item.content_id]
+    contents = {}
+    if content_ids:
+        contents = {c.id: c for c in Content.query.filter(Content.id.in_(content_ids)).all()}
+    
+    items = [serialize_job_item(item, contents.get(item.content_id)) for item in job.items]
+    return jsonify({
+        'success': True,
+        'job_id': job.id,
+        'total': len(items),
+        'finished': all(item['status'] in ('done', 'failed') for item in items),
+        'items': items
+    })
+
+
+@bp.route('/api/process-jobs/<int:job_id>/retry', methods=['POST'])
+@login_required
+def retry_process_job(job_id):
+    """将任务中失败的内容项重新放回队列"""
+    job = ProcessJob.query.get_or_404(job_id)
+    count = requeue_job_items(ProcessJobItem.query.filter_by(job_id=job.id, status='failed').all())
+    db.session.commit()
+    return jsonify({'success': True, 'retried': count})
+
+
+@bp.route('/api/process-jobs/<int:job_id>/events')
+@login_required
+def process_job_events(job_id):
+    """处理进度事件流（Server-Sent Events），支持通过Last-Event-ID断线续传"""
+    job = ProcessJob.query.get_or_404(job_id)
+    total = len(job.items)
+    last_event_id = request.headers.get('Last-Event-ID', type=int) or request.args.get('last_event_id', 0, type=int)
+    db.session.rollback()
+    
+    def generate():
+        nonlocal last_event_id
+        # 浏览器断线后1秒重连
+        yield 'retry: 1000\n\n'
+        started = last_beat = time.time()
+        
+        while True:
+            # 先统计完成数再读取事件：状态变化和事件在同一事务中提交，统计到的完成项的事件一定能读到
+            finished, failed = db.session.query(
+                db.func.count(ProcessJobItem.id),
+                db.func.coalesce(db.func.sum(db.case((ProcessJobItem.status == 'failed', 1), else_=0)), 0)
+            ).filter(ProcessJobItem.job_id == job_id, ProcessJobItem.status.in_(['done', 'failed'])).one()
+            events = (db.session.query(ProcessJobEvent.id, ProcessJobEvent.data)
+                      .filter(ProcessJobEvent.job_id == job_id, ProcessJobEvent.id > last_event_id)
+                      .order_by(ProcessJobEvent.id).all())
+            # 结束读事务，避免长连接阻塞worker写入
+            db.session.rollback()
+            
+            for event_id, data in events:
+                last_event_id = event_id
+                yield f'id: {event_id}\ndata: {data}\n\n'
+            
+            # 所有项都已完成，并且这一轮没有新事件时才结束
+            if finished == total and not events:
+                yield f'id: {last_event_id}\nevent: done\ndata: {{"failed":{failed}}}\n\n'
+                return
+            
+            now = time.time()
+            if now - started >= EVENT_STREAM_MAX_DURATION:
+                return
+            if now - last_beat >= EVENT_STREAM_HEARTBEAT:
+                last_beat = now
+                yield ': ping\n\n'
+            if not events:
+                time.sleep(EVENT_STREAM_POLL_INTERVAL)
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+
+@bp.route('/admin/queue')
+@login_required
+def admin_queue():
+    """后台处理队列状态"""
+    stats = get_queue_stats()
+    jobs = ProcessJob.query.order_by(ProcessJob.id.desc()).limit(20).all()
+    
+    job_rows = []
+    for job in jobs:
+        counts = {'pending': 0, 'running': 0, 'done': 0, 'failed': 0}
+        for item in job.items:
+            counts[item.status] = counts.get(item.status, 0) + 1
+        job_rows.append({'job': job, 'total': len(job.items), 'counts': counts})
+    
+    return render_template('admin_queue.html', stats=stats, job_rows=job_rows, worker=get_worker_status())
+
+
+@bp.route('/admin/queue/retry-failed', methods=['POST'])
+@login_required
+def retry_failed_items():
+    """重试所有失败的队列项"""
+    count = requeue_job_items(ProcessJobItem.query.filter_by(status='failed').all())
+    db.session.commit()
+    flash(f'已重新加入队列 {count} 项', 'success')
+    return redirect(url_for('main.admin_queue'))
+
+
+@bp.route('/api/search')
+def search_api():
+    """搜索章节内容：按文本、翻译和音标前缀匹配，结果按相关度排序"""
+    query = request.args.get('q', '').strip()
+    # 限制在1~50之间：负数传给SQLite的LIMIT表示不限制条数
+    limit = max(1, min(request.args.get('limit', 20, type=int), 50))
+    
+    if not query:
+        return jsonify({'success': True, 'query': query, 'results': []})
+    
+    return jsonify({
+        'success': True,
+        'query': query,
+        'results': search_contents(query, limit)
+    })
+
+
+@bp.route('/admin/chapter/<int:chapter_id>')
 @login_required
 def admin_chapter_detail(chapter_id):
     """管理端章节详情"""
@@ -504,21 +1671,68 @@ def admin_chapter_detail(chapter_id):
     return render_template('admin_chapter_detail.html', chapter=chapter)
 
 
-@app.route('/chapter/<int:chapter_id>')
+@bp.route('/chapter/<int:chapter_id>')
 def chapter_detail(chapter_id):
     """学习端章节详情"""
+    return cached_chapter_page('chapter_detail', chapter_id, render_chapter_detail)
+
+
+def render_chapter_detail(chapter_id):
     chapter = Chapter.query.get_or_404(chapter_id)
     return render_template('chapter_detail.html', chapter=chapter)
 
 
-@app.route('/chapter/<int:chapter_id>/dictation')
+@bp.route('/chapter/<int:chapter_id>/dictation')
 def dictation_mode(chapter_id):
     """听写模式"""
+    return cached_chapter_page('dictation', chapter_id, render_dictation)
+
+
+def render_dictation(chapter_id):
     chapter = Chapter.query.get_or_404(chapter_id)
-    return render_template('dictation.html', chapter=chapter)
+    dictation_items = (
+        [{'id': content.id, 'text': content.text, 'type': 'content'} for content in chapter.contents] +
+        [{'text': word.word, 'type': 'word'} for word in chapter.words] +
+        [{'text': phrase.phrase, 'type': 'phrase'} for phrase in chapter.phrases]
+    )
+    return render_template('dictation.html', chapter=chapter, dictation_items=dictation_items)
+
+
+@bp.route('/api/dictation/attempts', methods=['POST'])
+def dictation_attempts():
+    """批量上报听写结果"""
+    data = request.get_json(force=True, silent=True)
+    if not isinstance(data, dict):
+        return jsonify({'success': False, 'error': '参数缺失'}), 400
+    attempts = data.get('attempts')
+    
+    if not isinstance(attempts, list) or not attempts:
+        return jsonify({'success': False, 'error': '参数缺失'}), 400
+    if len(attempts) > DICTATION_BATCH_LIMIT:
+        return jsonify({'success': False, 'error': f'单次最多上报{DICTATION_BATCH_LIMIT}条'}), 400
+    
+    session_id = str(data.get('session_id') or '')[:64] or None
+    try:
+        recorded = record_dictation_attempts(attempts, session_id)
+        return jsonify({'success': True, 'recorded': recorded})
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
 
 
-@app.route('/admin/content/<int:content_id>/delete', methods=['POST'])
+@bp.route('/admin/dictation-stats')
+@login_required
+def admin_dictation_stats():
+    """听写统计：正确率最低的内容项"""
+    chapter_id = request.args.get('chapter_id', type=int)
+    chapters = Chapter.query.order_by(Chapter.created_date.desc()).all()
+    return render_template('admin_dictation_stats.html',
+                         chapters=chapters,
+                         chapter_id=chapter_id,
+                         items=get_hardest_contents(chapter_id))
+
+
+@bp.route('/admin/content/<int:content_id>/delete', methods=['POST'])
 @login_required
 def delete_content(content_id):
     """删除内容项"""
@@ -527,10 +1741,10 @@ def delete_content(content_id):
     db.session.delete(content)
     db.session.commit()
     flash('内容删除成功', 'success')
-    return redirect(url_for('admin_chapter_detail', chapter_id=chapter_id))
+    return redirect(url_for('main.admin_chapter_detail', chapter_id=chapter_id))
 
 
-@app.route('/api/test-translation', methods=['POST'])
+@bp.route('/api/test-translation', methods=['POST'])
 @login_required
 def test_translation():
     """测试百度翻译API"""
@@ -554,7 +1768,7 @@ def test_translation():
         })
 
 
-@app.route('/api/test-tts')
+@bp.route('/api/test-tts')
 def test_tts():
     """测试TTS功能"""
     try:
@@ -574,6 +1788,7 @@ def test_tts():
         socket.setdefaulttimeout(3)  # 测试时设置更短的超时
         
         try:
+            from gtts import gTTS
             tts = gTTS(text=word, lang='en')
             filename = f"test_{uuid.uuid4()}.mp3"
             filepath = os.path.join(audio_dir, filename)
@@ -617,7 +1832,7 @@ def test_tts():
         return jsonify({'success': False, 'error': str(e)})
 
 
-@app.route('/api/tts/<word>')
+@bp.route('/api/tts/<word>')
 def text_to_speech(word):
     """文本转语音API - 带备用方案"""
     try:
@@ -670,6 +1885,7 @@ def text_to_speech(word):
             def generate_tts():
                 nonlocal tts_success, tts_error
                 try:
+                    from gtts import gTTS
                     tts = gTTS(text=word, lang='en')
                     tts.save(cached_filepath)
                     # 检查文件是否成功生成且非空
@@ -737,7 +1953,7 @@ def text_to_speech(word):
         return jsonify({'error': str(e), 'success': False}), 500
 
 
-@app.route('/admin/word/<int:word_id>/delete', methods=['POST'])
+@bp.route('/admin/word/<int:word_id>/delete', methods=['POST'])
 @login_required
 def delete_word(word_id):
     """删除单词"""
@@ -746,10 +1962,10 @@ def delete_word(word_id):
     db.session.delete(word)
     db.session.commit()
     flash('单词删除成功', 'success')
-    return redirect(url_for('admin_chapter_detail', chapter_id=chapter_id))
+    return redirect(url_for('main.admin_chapter_detail', chapter_id=chapter_id))
 
 
-@app.route('/admin/phrase/<int:phrase_id>/delete', methods=['POST'])
+@bp.route('/admin/phrase/<int:phrase_id>/delete', methods=['POST'])
 @login_required
 def delete_phrase(phrase_id):
     """删除短语"""
@@ -758,10 +1974,10 @@ def delete_phrase(phrase_id):
     db.session.delete(phrase)
     db.session.commit()
     flash('短语删除成功', 'success')
-    return redirect(url_for('admin_chapter_detail', chapter_id=chapter_id))
+    return redirect(url_for('main.admin_chapter_detail', chapter_id=chapter_id))
 
 
-@app.route('/api/tts-config', methods=['GET', 'POST'])
+@bp.route('/api/tts-config', methods=['GET', 'POST'])
 def tts_config_api():
     """TTS配置API"""
     if request.method == 'GET':
@@ -803,7 +2019,36 @@ def tts_config_api():
             }), 400
 
 
-@app.route('/api/browser-voices')
+@bp.route('/static/dist/<path:filename>')
+def dist_asset(filename):
+    """带指纹的静态资源：按Accept-Encoding返回预压缩版本，并长期缓存"""
+    dist_dir = os.path.join(current_app.static_folder, 'dist')
+
+    # 预压缩文件只通过Content-Encoding返回，不能直接访问
+    if filename.endswith(('.gz', '.br')):
+        abort(404)
+
+    # 只有资源映射中带指纹的文件内容不会变化，manifest.json等其他文件按普通静态文件返回
+    if f'dist/{filename}' not in get_asset_manifest().values():
+        return send_from_directory(dist_dir, filename)
+
+    mimetype = mimetypes.guess_type(filename)[0]
+    for encoding, suffix in (('br', '.br'), ('gzip', '.gz')):
+        # accept_encodings会处理q值，q=0表示客户端不接受该编码
+        if request.accept_encodings[encoding] and os.path.exists(os.path.join(dist_dir, filename + suffix)):
+            response = send_from_directory(dist_dir, filename + suffix, mimetype=mimetype, max_age=ASSET_MAX_AGE)
+            response.headers['Content-Encoding'] = encoding
+            break
+    else:
+        response = send_from_directory(dist_dir, filename, max_age=ASSET_MAX_AGE)
+
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+
+@bp.route('/api/browser-voices')
 def get_browser_voices():
     """获取可用的浏览器语音列表（前端调用后返回）"""
     return jsonify({
@@ -812,61 +2057,137 @@ def get_browser_voices():
     })
 
 
-@app.cli.command("init-db")
+@bp.cli.command("init-db")
 def init_db():
     """Initialize the database tables"""
     try:
-        with app.app_context():
-            # 创建表，如果表已存在则添加新列
-            db.create_all()
+        # 创建表，如果表已存在则添加新列
+        ensure_schema()
+        # 每次部署启动时清空页面缓存，旧版本的页面引用的资源文件可能已不存在
+        cleared = PageCache.query.delete()
+        db.session.commit()
+        print(f"已清空页面缓存 {cleared} 条")
     except Exception as e:
         print(f"数据库初始化失败: {str(e)}")
 
 
+@bp.cli.command("migrate-vocabulary")
+def migrate_vocabulary():
+    """Fold existing Content, Word and Phrase rows into the vocabulary table"""
+    ensure_schema()
+    created, migrated, folded = migrate_to_vocabulary()
+    print(f"词汇迁移完成：新增词汇 {created} 个，迁移内容项 {migrated} 个，合并旧单词/短语 {folded} 个")
+
+
+@bp.cli.command("process-worker")
+def process_worker():
+    """Run the background content processing worker"""
+    ensure_schema()
+
+    # 上次退出时未完成的项重新放回队列
+    reset = requeue_job_items(ProcessJobItem.query.filter_by(status='running').all(), reset_attempts=False)
+    db.session.commit()
+    record_worker_heartbeat(started=True)
+    last_beat = time.time()
+    last_claim = None
+    print(f"处理队列worker已启动，恢复未完成项 {reset} 个")
+
+    while True:
+        try:
+            if time.time() - last_beat >= PROCESS_HEARTBEAT_INTERVAL:
+                record_worker_heartbeat(last_claim=last_claim)
+                last_beat = time.time()
+
+            item = claim_next_job_item()
+            if not item:
+                db.session.remove()
+                time.sleep(PROCESS_POLL_INTERVAL)
+                continue
+
+            last_claim = datetime.utcnow()
+            item = run_job_item(item)
+            print(f"队列项 #{item.id} '{item.text}': {item.status}")
+        except Exception as e:
+            db.session.rollback()
+            print(f"处理队列异常: {str(e)}")
+            time.sleep(PROCESS_POLL_INTERVAL)
+
+
+@bp.cli.command("export-chapters")
+@click.argument('output', type=click.File('w', encoding='utf-8'), default='-')
+@click.option('--chapter-id', 'chapter_ids', type=int, multiple=True, help='Only export these chapters')
+def export_chapters(output, chapter_ids):
+    """Export chapters and their content items as JSONL (default: stdout)"""
+    for line in iter_chapter_export(chapter_ids):
+        output.write(line)
+
+
+@bp.cli.command("import-chapters")
+@click.argument('input_file', type=click.File('r', encoding='utf-8'))
+@click.option('--after-chapter-id', type=int, help='Skip source chapters up to this id (resume an interrupted import)')
+def import_chapters(input_file, after_chapter_id):
+    """Import chapters exported by export-chapters (use - for stdin)"""
+    ensure_schema()
+    progress = {}
+    try:
+        import_chapter_lines(input_file, after_chapter_id, progress)
+    except Exception as e:
+        print(f"章节导入失败: {str(e)}")
+        print(f"已导入章节 {progress['chapters']} 个，内容项 {progress['items']} 个")
+        if progress['last_chapter_id'] is not None:
+            print(f"使用 --after-chapter-id {progress['last_chapter_id']} 重新运行可从下一个章节继续")
+        return
+    print(f"章节导入完成：新增章节 {progress['chapters']} 个，内容项 {progress['items']} 个，"
+          f"跳过 {progress['skipped']} 行")
+
+
+@bp.cli.command("backup-db")
+@click.argument('path', required=False)
+def backup_db(path):
+    """Take a consistent online backup of the SQLite database"""
+    if not path:
+        path = os.path.join(current_app.instance_path, 'backups',
+                            f"en_study-{datetime.now().strftime('%Y%m%d-%H%M%S')}.db")
+    try:
+        size = backup_database(path)
+    except Exception as e:
+        print(f"数据库备份失败: {str(e)}")
+        return
+    print(f"数据库已备份到 {path}（{size} 字节）")
+
+
+@event.listens_for(Engine, 'connect')
+def configure_sqlite(dbapi_connection, connection_record):
+    """SQLite使用WAL模式：读写互不阻塞，课堂上多人同时上报听写结果时减少锁等待；注册搜索索引使用的函数"""
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute('PRAGMA synchronous=NORMAL')
+        cursor.close()
+        # 按字子串索引的触发器调用该函数
+        dbapi_connection.create_function('split_search_chars', 1, split_search_chars, deterministic=True)
+
+
+def create_app():
+    """应用工厂：只加载配置并注册扩展和路由，导入和创建时不访问网络和数据库"""
+    app = Flask(__name__)
+    app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key')
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', 'sqlite:///en_study.db')
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+
+    db.init_app(app)
+    login_manager.init_app(app)
+    app.register_blueprint(bp)
+    return app
+
+
+# gunicorn app:app 和 flask 命令使用的应用实例
+app = create_app()
+
 
 if __name__ == '__main__':
     with app.app_context():
         # 创建表，如果表已存在则添加新列
-        db.create_all()
-        
-        # 检查并添加内容表
-        try:
-            db.session.execute(db.text("SELECT id FROM content LIMIT 1"))
-        except Exception:
-            try:
-                db.session.execute(db.text("""CREATE TABLE content (
-                    id INTEGER PRIMARY KEY,
-                    text VARCHAR(300) NOT NULL,
-                    translation VARCHAR(400),
-                    phonetic VARCHAR(200),
-                    chapter_id INTEGER NOT NULL,
-                    created_date DATETIME NOT NULL,
-                    FOREIGN KEY(chapter_id) REFERENCES chapter(id)
-                )"""))
-                db.session.commit()
-                print("内容表创建成功")
-            except Exception as e:
-                print(f"创建内容表失败: {e}")
+        ensure_schema()
         
-        # 检查并添加TTS配置表
-        try:
-            db.session.execute(db.text("SELECT id FROM tts_config LIMIT 1"))
-        except Exception:
-            try:
-                db.session.execute(db.text("""CREATE TABLE tts_config (
-                    id INTEGER PRIMARY KEY,
-                    tts_mode VARCHAR(20) NOT NULL DEFAULT 'auto',
-                    server_timeout INTEGER DEFAULT 8,
-                    browser_rate FLOAT DEFAULT 0.8,
-                    browser_pitch FLOAT DEFAULT 1.0,
-                    browser_volume FLOAT DEFAULT 1.0,
-                    preferred_voice VARCHAR(100) DEFAULT '',
-                    created_date DATETIME NOT NULL,
-                    updated_date DATETIME NOT NULL
-                )"""))
-                db.session.commit()
-                print("TTS配置表创建成功")
-            except Exception as e:
-                print(f"创建TTS配置表失败: {e}")
-                
     app.run(debug=True)
@@ -0,0 +1,51 @@
+"""启动耗时基准测试
+
+在全新的Python进程中多次导入app模块，统计导入和create_app()的耗时，
+并检查gTTS、requests等重量级依赖没有在启动时被加载。
+
+用法：
+    python bench_startup.py [运行次数]
+"""
+import json
+import statistics
+import subprocess
+import sys
+
+PROBE = '''
+import json, sys, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+app.create_app()
+created = time.perf_counter()
+print(json.dumps({
+    'import_ms': (imported - start) * 1000,
+    'create_app_ms': (created - imported) * 1000,
+    'heavy_modules': sorted(m for m in ('gtts', 'nltk', 'requests') if m in sys.modules),
+}))
+'''
+
+
+def run_once():
+    output = subprocess.run([sys.executable, '-c', PROBE], capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    results = [run_once() for _ in range(runs)]
+
+    import_ms = [r['import_ms'] for r in results]
+    create_ms = [r['create_app_ms'] for r in results]
+    heavy = sorted({m for r in results for m in r['heavy_modules']})
+
+    print(f"运行次数: {runs}")
+    print(f"导入app耗时: 中位数 {statistics.median(import_ms):.1f} ms，最大 {max(import_ms):.1f} ms")
+    print(f"create_app()耗时: 中位数 {statistics.median(create_ms):.1f} ms，最大 {max(create_ms):.1f} ms")
+    print(f"启动时加载的重量级依赖: {', '.join(heavy) if heavy else '无'}")
+
+    return 1 if heavy else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
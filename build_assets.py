@@ -0,0 +1,125 @@
+"""静态资源构建
+
+压缩 static/js 和 static/css 下的文件（去掉 console.log 调试输出），
+按内容哈希生成带指纹的文件名，并生成 gzip/brotli 预压缩版本，
+输出到 static/dist，映射关系写入 static/dist/manifest.json。
+
+应用中 url_for('static', filename='js/main.js') 会自动解析为带指纹的地址。
+
+用法：
+    python build_assets.py
+"""
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+
+import rcssmin
+import rjsmin
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+DIST_DIR = os.path.join(STATIC_DIR, 'dist')
+ASSET_DIRS = ('js', 'css')
+
+CONSOLE_LOG_START = re.compile(r'^([ \t]*)console\.log\(', re.MULTILINE)
+
+
+def strip_console_log(source):
+    """删除独占一行的 console.log(...) 语句，替换为空语句保证 if/else 等结构不变"""
+    result = []
+    pos = 0
+    for match in CONSOLE_LOG_START.finditer(source):
+        if match.start() < pos:
+            continue
+
+        # 找到与左括号配对的右括号，跳过字符串中的括号
+        i = match.end()
+        depth = 1
+        quote = None
+        while i < len(source) and depth:
+            char = source[i]
+            if quote:
+                if char == '\\':
+                    i += 1
+                elif char == quote:
+                    quote = None
+            elif char in '\'"`':
+                quote = char
+            elif char == '(':
+                depth += 1
+            elif char == ')':
+                depth -= 1
+            i += 1
+
+        # 只处理以分号或换行结束的完整语句
+        rest = source[i:]
+        tail = re.match(r'[ \t]*;?[ \t]*(?=\r?\n|$)', rest)
+        if depth or not tail:
+            continue
+
+        result.append(source[pos:match.start()])
+        result.append(match.group(1) + ';')
+        pos = i + tail.end()
+
+    result.append(source[pos:])
+    return ''.join(result)
+
+
+def minify(path, source):
+    if path.endswith('.js'):
+        return rjsmin.jsmin(strip_console_log(source))
+    return rcssmin.cssmin(source)
+
+
+def build():
+    if os.path.exists(DIST_DIR):
+        shutil.rmtree(DIST_DIR)
+
+    manifest = {}
+    for asset_dir in ASSET_DIRS:
+        source_dir = os.path.join(STATIC_DIR, asset_dir)
+        os.makedirs(os.path.join(DIST_DIR, asset_dir))
+
+        for name in sorted(os.listdir(source_dir)):
+            if not name.endswith(('.js', '.css')):
+                continue
+
+            logical = f'{asset_dir}/{name}'
+            with open(os.path.join(source_dir, name), encoding='utf-8') as f:
+                source = f.read()
+            data = minify(name, source).encode('utf-8')
+
+            digest = hashlib.sha256(data).hexdigest()[:10]
+            stem, ext = os.path.splitext(name)
+            hashed = f'dist/{asset_dir}/{stem}.{digest}{ext}'
+            target = os.path.join(STATIC_DIR, hashed)
+
+            with open(target, 'wb') as f:
+                f.write(data)
+            with open(target + '.gz', 'wb') as f:
+                f.write(gzip.compress(data, compresslevel=9, mtime=0))
+            if brotli:
+                with open(target + '.br', 'wb') as f:
+                    f.write(brotli.compress(data, quality=11))
+
+            manifest[logical] = hashed
+            gz_size = os.path.getsize(target + '.gz')
+            print(f'{logical}: {len(source.encode("utf-8"))} -> {len(data)} 字节，gzip {gz_size} 字节 => {hashed}')
+
+    with open(os.path.join(DIST_DIR, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+    if not brotli:
+        print('未安装brotli，跳过.br文件生成')
+    print(f'共生成 {len(manifest)} 个资源文件')
+
+
+if __name__ == '__main__':
+    build()
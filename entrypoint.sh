@@ -17,8 +17,22 @@ echo "Initializing database..."
 # 或者: flask --app your_application_module:create_app() init-db
 flask init-db
 
+echo "Migrating vocabulary..."
+# 旧的内容项和单词/短语合并到词汇表，已迁移的数据会跳过
+flask migrate-vocabulary
+
+echo "Starting background worker..."
+# 后台处理队列只需要一个worker进程，状态保存在数据库中，重启后自动续跑
+# worker异常退出后1秒自动重启（set -e 不能让循环因worker退出而结束）
+(
+  while true; do
+    flask process-worker || echo "Background worker exited, restarting..."
+    sleep 1
+  done
+) &
 
 echo "Starting Gunicorn..."
 # 用 exec "$@" 来执行 CMD 中指定的命令，或者直接启动 Gunicorn
 # exec "$@"
-gunicorn  -w 4 --bind 0.0.0.0:50001 app:app # 根据您的应用调整
\ No newline at end of file
+# 使用线程worker，处理进度事件流等长连接不会占满全部worker
+exec gunicorn  -w 4 --threads 4 --preload --bind 0.0.0.0:50001 app:app # 根据您的应用调整
\ No newline at end of file
@@ -0,0 +1,141 @@
+// TTS模式管理
+let useBrowserTTS = localStorage.getItem('useBrowserTTS') === 'true';
+
+// 更新TTS模式显示
+function updateTTSModeDisplay() {
+    const modeText = document.getElementById('tts-mode-text');
+    const toggleBtn = document.getElementById('tts-mode-toggle');
+    
+    if (useBrowserTTS) {
+        modeText.textContent = '浏览器TTS';
+        toggleBtn.classList.remove('btn-outline-info');
+        toggleBtn.classList.add('btn-info');
+    } else {
+        modeText.textContent = '服务器TTS';
+        toggleBtn.classList.remove('btn-info');
+        toggleBtn.classList.add('btn-outline-info');
+    }
+}
+
+// 初始化显示
+updateTTSModeDisplay();
+
+// TTS模式切换
+document.getElementById('tts-mode-toggle').addEventListener('click', function() {
+    useBrowserTTS = !useBrowserTTS;
+    localStorage.setItem('useBrowserTTS', useBrowserTTS.toString());
+    updateTTSModeDisplay();
+    
+    if (useBrowserTTS) {
+        console.log('已切换到浏览器内置语音');
+    } else {
+        console.log('已切换到服务器语音服务');
+    }
+});
+
+// 重写playAudio函数以支持模式切换
+window.playAudioOriginal = window.playAudio; // 保存原函数
+
+window.playAudio = function(text, button) {
+    if (useBrowserTTS) {
+        // 使用浏览器TTS
+        if (typeof window.playAudioWithBrowserTTS === 'function') {
+            window.playAudioWithBrowserTTS(text, button);
+        } else {
+            // 如果主函数不存在，使用本地实现
+            playBrowserTTSLocal(text, button);
+        }
+    } else {
+        // 使用统一的语音播放函数（内部会自动判断）
+        if (typeof window.playAudioOriginal === 'function') {
+            window.playAudioOriginal(text, button);
+        } else {
+            // 如果原函数不存在，使用本地实现
+            playBrowserTTSLocal(text, button);
+        }
+    }
+};
+
+// 本地浏览器TTS实现（直接使用原生API，避免循环调用）
+function playBrowserTTSLocal(text, button) {
+    if (button && button.disabled) return;
+    
+    let icon, originalClass;
+    if (button) {
+        icon = button.querySelector('i');
+        originalClass = icon.className;
+        
+        icon.className = 'fas fa-volume-up';
+        button.disabled = true;
+        
+        setTimeout(() => {
+            if (icon) icon.className = originalClass;
+            if (button) button.disabled = false;
+        }, 1000);
+    }
+    
+    console.log('Using local browser TTS implementation for:', text);
+    
+    if ('speechSynthesis' in window) {
+        speechSynthesis.cancel();
+        
+        const utterance = new SpeechSynthesisUtterance(text);
+        utterance.lang = 'en-US';
+        utterance.rate = 0.8;
+        utterance.pitch = 1;
+        utterance.volume = 1;
+        
+        const voices = speechSynthesis.getVoices();
+        const englishVoice = voices.find(voice => 
+            voice.lang.startsWith('en') && voice.default
+        ) || voices.find(voice => 
+            voice.lang.startsWith('en')
+        );
+        
+        if (englishVoice) {
+            utterance.voice = englishVoice;
+        }
+        
+        utterance.onstart = () => console.log('Local browser TTS started');
+        utterance.onend = () => console.log('Local browser TTS ended');
+        utterance.onerror = (error) => console.error('Local browser TTS error:', error);
+        
+        if (voices.length === 0) {
+            speechSynthesis.onvoiceschanged = () => {
+                speechSynthesis.speak(utterance);
+            };
+        } else {
+            speechSynthesis.speak(utterance);
+        }
+        
+        if (typeof showToast === 'function') {
+            console.log('浏览器语音播放');
+        }
+    } else {
+        if (typeof showToast === 'function') {
+            console.warn('浏览器不支持语音合成');
+        } else {
+            alert('浏览器不支持语音合成');
+        }
+        
+        if (button && icon) {
+            icon.className = originalClass;
+            button.disabled = false;
+        }
+    }
+}
+// 键盘快捷键支持
+document.addEventListener('keydown', function(e) {
+    // 空格键或回车键播放第一个单词的发音
+    if ((e.code === 'Space' || e.code === 'Enter') && !e.target.matches('input, textarea, select')) {
+        e.preventDefault();
+        const firstPlayButton = document.querySelector('.play-word');
+        if (firstPlayButton) {
+            const content = firstPlayButton.closest('.word-card, .phrase-card');
+            if (content) {
+                const word = content.querySelector('.word-text, .phrase-text').textContent.trim();
+                playAudio(word, firstPlayButton);
+            }
+        }
+    }
+});
@@ -0,0 +1,404 @@
+// 听写模式数据
+const dictationData = window.dictationData;
+
+let currentIndex = 0;
+let isPlaying = false;
+let isAnswerRevealed = false; // 新增：记录答案是否已显示
+
+// DOM元素
+const startScreen = document.getElementById('start-screen');
+const wordDisplay = document.getElementById('word-display');
+const completeScreen = document.getElementById('complete-screen');
+const wordCovered = document.getElementById('word-covered');
+const wordRevealed = document.getElementById('word-revealed');
+const currentWordEl = document.getElementById('current-word');
+const wordHintEl = document.getElementById('word-hint');
+const playBtn = document.getElementById('play-btn');
+const showAnswerBtn = document.getElementById('show-answer-btn');
+const prevBtn = document.getElementById('prev-btn');
+const nextBtn = document.getElementById('next-btn');
+const startBtn = document.getElementById('start-btn');
+const restartBtn = document.getElementById('restart-btn');
+const progressBar = document.getElementById('progress-bar');
+const currentIndexEl = document.getElementById('current-index');
+const totalCountEl = document.getElementById('total-count');
+const audioPlayer = document.getElementById('audioPlayer');
+const markArea = document.getElementById('mark-area');
+const markCorrectBtn = document.getElementById('mark-correct-btn');
+const markWrongBtn = document.getElementById('mark-wrong-btn');
+
+// 听写结果先缓存在本地，攒够一批或定时批量上报，减少请求次数
+const ATTEMPT_FLUSH_SIZE = 20;
+const ATTEMPT_FLUSH_INTERVAL = 15000;
+const attemptSessionId = (window.crypto && crypto.randomUUID) ? crypto.randomUUID() : String(Date.now()) + Math.random();
+let attemptBuffer = [];
+
+// 初始化
+totalCountEl.textContent = dictationData.length;
+
+// 等待全局TTS配置加载
+function waitForTTSConfig() {
+    if (window.globalTTSConfig) {
+        console.log('听写模式：全局TTS配置已加载', window.globalTTSConfig);
+        return true;
+    } else {
+        console.log('听写模式：等待全局TTS配置加载...');
+        return false;
+    }
+}
+
+// 每200ms检查一次配置是否加载，最多等待5秒
+let configCheckInterval;
+let configCheckCount = 0;
+const maxConfigChecks = 25; // 5秒 / 200ms = 25次
+
+function startConfigCheck() {
+    configCheckInterval = setInterval(() => {
+        configCheckCount++;
+        if (waitForTTSConfig()) {
+            clearInterval(configCheckInterval);
+            console.log('听写模式：TTS配置加载完成，可以开始使用');
+        } else if (configCheckCount >= maxConfigChecks) {
+            clearInterval(configCheckInterval);
+            console.warn('听写模式：TTS配置加载超时，将使用默认配置');
+        }
+    }, 200);
+}
+
+// 开始检查TTS配置
+startConfigCheck();
+
+// 开始听写
+startBtn.addEventListener('click', function() {
+    if (dictationData.length === 0) {
+        alert('本章节暂无单词或短语');
+        return;
+    }
+    
+    startScreen.classList.add('d-none');
+    wordDisplay.classList.remove('d-none');
+    currentIndex = 0;
+    showCurrentWord();
+});
+
+// 重新开始
+restartBtn.addEventListener('click', function() {
+    completeScreen.classList.add('d-none');
+    wordDisplay.classList.remove('d-none');
+    currentIndex = 0;
+    showCurrentWord();
+});
+
+// 显示当前单词
+function showCurrentWord() {
+    if (currentIndex >= dictationData.length) {
+        // 显示完成界面
+        wordDisplay.classList.add('d-none');
+        completeScreen.classList.remove('d-none');
+        flushAttempts();
+        return;
+    }
+    
+    const current = dictationData[currentIndex];
+    currentWordEl.textContent = current.text;
+    
+    // 重置答案显示状态
+    isAnswerRevealed = false;
+    showWordCovered();
+    
+    // 生成单词提示（显示字符数量）
+    const wordLength = current.text.length;
+    const hintText = `${wordLength} 个字符`;
+    if (current.type === 'phrase') {
+        wordHintEl.textContent = `短语 (${hintText})`;
+    } else if (current.type === 'word') {
+        wordHintEl.textContent = `单词 (${hintText})`;
+    } else {
+        wordHintEl.textContent = `内容 (${hintText})`;
+    }
+    
+    // 更新进度
+    const progress = ((currentIndex + 1) / dictationData.length) * 100;
+    progressBar.style.width = progress + '%';
+    currentIndexEl.textContent = currentIndex + 1;
+    
+    // 更新按钮状态
+    prevBtn.disabled = currentIndex === 0;
+    nextBtn.textContent = currentIndex === dictationData.length - 1 ? '完成' : '下一个 ';
+    if (currentIndex === dictationData.length - 1) {
+        nextBtn.innerHTML = '完成 <i class="fas fa-check"></i>';
+    } else {
+        nextBtn.innerHTML = '下一个 <i class="fas fa-chevron-right"></i>';
+    }
+    
+    // 自动播放当前单词发音（根据规范延迟500ms）
+    setTimeout(() => {
+        console.log('自动播放当前单词：', current.text);
+        // 检查全局TTS配置是否加载
+        if (window.globalTTSConfig) {
+            console.log('使用全局TTS配置进行自动播放：', window.globalTTSConfig);
+        } else {
+            console.warn('全局TTS配置未加载，使用默认参数');
+        }
+        playCurrentWord();
+    }, 500); // 延迟500ms播放，给界面更新时间
+}
+
+// 显示遮盖状态
+function showWordCovered() {
+    wordCovered.classList.remove('d-none');
+    wordRevealed.classList.add('d-none');
+    showAnswerBtn.disabled = false;
+    showAnswerBtn.innerHTML = '<i class="fas fa-eye"></i> 显示答案';
+}
+
+// 显示答案
+function showWordRevealed() {
+    wordCovered.classList.add('d-none');
+    wordRevealed.classList.remove('d-none');
+    showAnswerBtn.disabled = true;
+    showAnswerBtn.innerHTML = '<i class="fas fa-check"></i> 已显示';
+    isAnswerRevealed = true;
+    
+    // 只有内容项可以记录听写结果
+    const current = dictationData[currentIndex];
+    markArea.classList.toggle('d-none', !current.id);
+    markCorrectBtn.disabled = false;
+    markWrongBtn.disabled = false;
+}
+
+// 记录听写结果并进入下一个
+function markAttempt(correct) {
+    const current = dictationData[currentIndex];
+    if (!current.id) return;
+    
+    markCorrectBtn.disabled = true;
+    markWrongBtn.disabled = true;
+    attemptBuffer.push({ content_id: current.id, correct: correct });
+    if (attemptBuffer.length >= ATTEMPT_FLUSH_SIZE) {
+        flushAttempts();
+    }
+    
+    currentIndex++;
+    showCurrentWord();
+}
+
+// 批量上报听写结果；页面关闭时使用sendBeacon保证数据发出
+function flushAttempts(useBeacon) {
+    if (attemptBuffer.length === 0) return;
+    
+    const batch = attemptBuffer;
+    attemptBuffer = [];
+    const body = JSON.stringify({ session_id: attemptSessionId, attempts: batch });
+    
+    if (useBeacon && navigator.sendBeacon) {
+        navigator.sendBeacon('/api/dictation/attempts', new Blob([body], { type: 'application/json' }));
+        return;
+    }
+    
+    fetch('/api/dictation/attempts', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: body,
+        keepalive: true
+    }).then(function(response) {
+        if (!response.ok) throw new Error('HTTP ' + response.status);
+    }).catch(function(error) {
+        // 上报失败放回缓存，下次一起发送
+        console.warn('听写结果上报失败:', error);
+        attemptBuffer = batch.concat(attemptBuffer);
+    });
+}
+
+setInterval(flushAttempts, ATTEMPT_FLUSH_INTERVAL);
+window.addEventListener('pagehide', function() {
+    flushAttempts(true);
+});
+document.addEventListener('visibilitychange', function() {
+    if (document.visibilityState === 'hidden') {
+        flushAttempts(true);
+    }
+});
+
+// 播放发音（直接使用main.js中的全局函数）
+function playCurrentWord() {
+    if (isPlaying) return;
+    
+    const current = dictationData[currentIndex];
+    // 直接调用main.js中的统一函数
+    if (typeof window.playAudio === 'function') {
+        window.playAudio(current.text, playBtn);
+    } else {
+        // 如果主函数不存在，使用浏览器TTS备用方案
+        playAudioFallback(current.text);
+    }
+}
+
+// 手动播放发音（用户点击按钮）
+function manualPlayCurrentWord() {
+    if (isPlaying) return;
+    
+    const current = dictationData[currentIndex];
+    // 直接调用main.js中的统一函数
+    if (typeof window.playAudio === 'function') {
+        window.playAudio(current.text, playBtn);
+    } else {
+        // 如果主函数不存在，使用浏览器TTS备用方案
+        playAudioFallback(current.text);
+    }
+}
+
+// 使用浏览器语音播放
+function playCurrentWordBrowser() {
+    const current = dictationData[currentIndex];
+    playAudioDirectly(current.text, document.getElementById('play-browser-btn'));
+}
+
+// 直接使用浏览器TTS（使用全局配置）
+function playAudioDirectly(text, button) {
+    if (typeof window.playAudioWithBrowserTTS === 'function') {
+        window.playAudioWithBrowserTTS(text, button);
+    } else {
+        // 使用全局配置的备用方案
+        playAudioFallback(text);
+    }
+}
+
+// 浏览器内置语音合成备用方案（使用全局TTS配置）
+function playAudioFallback(text) {
+    if ('speechSynthesis' in window) {
+        console.log('Using browser speech synthesis as fallback for:', text);
+        
+        // 停止任何正在进行的语音
+        speechSynthesis.cancel();
+        
+        const utterance = new SpeechSynthesisUtterance(text);
+        utterance.lang = 'en-US';
+        
+        // 使用全局TTS配置中的参数，如果配置未加载则使用默认值
+        if (window.globalTTSConfig) {
+            utterance.rate = window.globalTTSConfig.browser_rate;
+            utterance.pitch = window.globalTTSConfig.browser_pitch;
+            utterance.volume = window.globalTTSConfig.browser_volume;
+            
+            console.log('Using global TTS config in dictation:', {
+                rate: utterance.rate,
+                pitch: utterance.pitch,
+                volume: utterance.volume,
+                preferred_voice: window.globalTTSConfig.preferred_voice
+            });
+        } else {
+            console.log('Global TTS config not loaded, using defaults');
+            utterance.rate = 0.8;
+            utterance.pitch = 1.0;
+            utterance.volume = 1.0;
+        }
+        
+        // 获取英语语音，优先使用配置中的偏好语音
+        const selectVoiceAndSpeak = () => {
+            const voices = speechSynthesis.getVoices();
+            let selectedVoice = null;
+            
+            // 首先尝试使用配置中的偏好语音
+            if (window.globalTTSConfig && window.globalTTSConfig.preferred_voice) {
+                selectedVoice = voices.find(voice => voice.name === window.globalTTSConfig.preferred_voice);
+                if (selectedVoice) {
+                    console.log('Using preferred voice from config:', selectedVoice.name, selectedVoice.lang);
+                } else {
+                    console.warn('Preferred voice not found:', window.globalTTSConfig.preferred_voice);
+                }
+            }
+            
+            // 如果没有找到偏好语音，使用默认的英语语音
+            if (!selectedVoice) {
+                selectedVoice = voices.find(voice => 
+                    voice.lang.startsWith('en') && voice.default
+                ) || voices.find(voice => 
+                    voice.lang.startsWith('en')
+                );
+                
+                if (selectedVoice) {
+                    console.log('Using default English voice:', selectedVoice.name, selectedVoice.lang);
+                }
+            }
+            
+            if (selectedVoice) {
+                utterance.voice = selectedVoice;
+            }
+            
+            utterance.onstart = () => console.log('Browser TTS started for dictation:', text);
+            utterance.onend = () => console.log('Browser TTS ended for dictation:', text);
+            utterance.onerror = (error) => console.error('Browser TTS error in dictation:', error);
+            
+            speechSynthesis.speak(utterance);
+        };
+        
+        // 确保语音列表已加载
+        if (speechSynthesis.getVoices().length === 0) {
+            console.log('Waiting for voices to load in dictation...');
+            speechSynthesis.onvoiceschanged = () => {
+                console.log('Voices loaded in dictation, proceeding with speech');
+                selectVoiceAndSpeak();
+                speechSynthesis.onvoiceschanged = null; // 避免重复调用
+            };
+        } else {
+            selectVoiceAndSpeak();
+        }
+        
+        return true;
+    } else {
+        console.warn('Browser speech synthesis not supported');
+        return false;
+    }
+}
+
+// 事件监听
+playBtn.addEventListener('click', manualPlayCurrentWord);
+showAnswerBtn.addEventListener('click', function() {
+    if (!isAnswerRevealed) {
+        showWordRevealed();
+    }
+});
+
+markCorrectBtn.addEventListener('click', function() {
+    markAttempt(true);
+});
+
+markWrongBtn.addEventListener('click', function() {
+    markAttempt(false);
+});
+
+prevBtn.addEventListener('click', function() {
+    if (currentIndex > 0) {
+        currentIndex--;
+        showCurrentWord();
+    }
+});
+
+nextBtn.addEventListener('click', function() {
+    currentIndex++;
+    showCurrentWord();
+});
+
+// 键盘快捷键
+document.addEventListener('keydown', function(e) {
+    if (wordDisplay.classList.contains('d-none')) return;
+    
+    switch(e.key) {
+        case ' ':
+        case 'Enter':
+            e.preventDefault();
+            manualPlayCurrentWord();
+            break;
+        case 'ArrowLeft':
+            e.preventDefault();
+            if (currentIndex > 0) {
+                prevBtn.click();
+            }
+            break;
+        case 'ArrowRight':
+            e.preventDefault();
+            nextBtn.click();
+            break;
+    }
+});
@@ -0,0 +1,229 @@
+// TTS配置管理
+document.addEventListener('DOMContentLoaded', function() {
+    const modal = document.getElementById('ttsConfigModal');
+    const form = document.getElementById('ttsConfigForm');
+    const saveBtn = document.getElementById('saveTTSConfig');
+    const testVoiceBtn = document.getElementById('testVoiceBtn');
+    
+    // 滑块值显示更新
+    function updateSliderValues() {
+        document.getElementById('serverTimeoutValue').textContent = document.getElementById('serverTimeout').value;
+        document.getElementById('browserRateValue').textContent = document.getElementById('browserRate').value;
+        document.getElementById('browserPitchValue').textContent = document.getElementById('browserPitch').value;
+        document.getElementById('browserVolumeValue').textContent = document.getElementById('browserVolume').value;
+    }
+    
+    // 绑定滑块事件
+    ['serverTimeout', 'browserRate', 'browserPitch', 'browserVolume'].forEach(id => {
+        document.getElementById(id).addEventListener('input', updateSliderValues);
+    });
+    
+    // 加载浏览器语音列表
+    function loadBrowserVoices() {
+        const voiceSelect = document.getElementById('preferredVoice');
+        const voices = speechSynthesis.getVoices();
+        
+        // 清空现有选项（保留默认选项）
+        while (voiceSelect.children.length > 1) {
+            voiceSelect.removeChild(voiceSelect.lastChild);
+        }
+        
+        // 添加英语语音
+        voices.filter(voice => voice.lang.startsWith('en')).forEach(voice => {
+            const option = document.createElement('option');
+            option.value = voice.name;
+            option.textContent = `${voice.name} (${voice.lang})`;
+            voiceSelect.appendChild(option);
+        });
+    }
+    
+    // 加载配置
+    function loadConfig() {
+        fetch('/api/tts-config')
+            .then(response => response.json())
+            .then(data => {
+                if (data.success) {
+                    const config = data.config;
+                    
+                    // 设置TTS模式
+                    document.querySelector(`input[name="tts_mode"][value="${config.tts_mode}"]`).checked = true;
+                    
+                    // 设置服务器配置
+                    document.getElementById('serverTimeout').value = config.server_timeout;
+                    
+                    // 设置浏览器配置
+                    document.getElementById('browserRate').value = config.browser_rate;
+                    document.getElementById('browserPitch').value = config.browser_pitch;
+                    document.getElementById('browserVolume').value = config.browser_volume;
+                    
+                    // 设置偏好语音
+                    if (config.preferred_voice) {
+                        document.getElementById('preferredVoice').value = config.preferred_voice;
+                    }
+                    
+                    // 更新滑块显示
+                    updateSliderValues();
+                } else {
+                    showToast('加载配置失败', 'error');
+                }
+            })
+            .catch(error => {
+                console.error('加载配置错误:', error);
+                showToast('加载配置错误', 'error');
+            });
+    }
+    
+    // 保存配置
+    function saveConfig() {
+        const formData = new FormData(form);
+        const config = {};
+        
+        for (let [key, value] of formData.entries()) {
+            if (key === 'server_timeout') {
+                config[key] = parseInt(value);
+            } else if (['browser_rate', 'browser_pitch', 'browser_volume'].includes(key)) {
+                config[key] = parseFloat(value);
+            } else {
+                config[key] = value;
+            }
+        }
+        
+        fetch('/api/tts-config', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify(config)
+        })
+            .then(response => response.json())
+            .then(data => {
+                if (data.success) {
+                    showToast('配置保存成功', 'success');
+                    bootstrap.Modal.getInstance(modal).hide();
+                } else {
+                    showToast(data.error || '保存失败', 'error');
+                }
+            })
+            .catch(error => {
+                console.error('保存配置错误:', error);
+                showToast('保存配置错误', 'error');
+            });
+    }
+    
+    // 试听语音
+    function testVoice() {
+        const rate = parseFloat(document.getElementById('browserRate').value);
+        const pitch = parseFloat(document.getElementById('browserPitch').value);
+        const volume = parseFloat(document.getElementById('browserVolume').value);
+        const voiceName = document.getElementById('preferredVoice').value;
+        
+        if ('speechSynthesis' in window) {
+            speechSynthesis.cancel();
+            
+            const utterance = new SpeechSynthesisUtterance('Hello, this is a test of the voice settings.');
+            utterance.lang = 'en-US';
+            utterance.rate = rate;
+            utterance.pitch = pitch;
+            utterance.volume = volume;
+            
+            if (voiceName) {
+                const voices = speechSynthesis.getVoices();
+                const selectedVoice = voices.find(voice => voice.name === voiceName);
+                if (selectedVoice) {
+                    utterance.voice = selectedVoice;
+                }
+            }
+            
+            speechSynthesis.speak(utterance);
+            showToast('正在试听语音设置...', 'info');
+        } else {
+            showToast('浏览器不支持语音合成', 'error');
+        }
+    }
+    
+    // 事件监听
+    modal.addEventListener('show.bs.modal', function() {
+        loadBrowserVoices();
+        loadConfig();
+    });
+    
+    saveBtn.addEventListener('click', saveConfig);
+    testVoiceBtn.addEventListener('click', testVoice);
+    
+    // 语音列表改变时更新
+    if ('speechSynthesis' in window) {
+        speechSynthesis.onvoiceschanged = loadBrowserVoices;
+    }
+});
+
+// 内容搜索
+document.addEventListener('DOMContentLoaded', function() {
+    const searchInput = document.getElementById('contentSearch');
+    const resultsBox = document.getElementById('searchResults');
+    let searchTimer = null;
+    let latestQuery = '';
+    
+    searchInput.addEventListener('input', function() {
+        clearTimeout(searchTimer);
+        searchTimer = setTimeout(runSearch, 200);
+    });
+    
+    async function runSearch() {
+        const query = searchInput.value.trim();
+        latestQuery = query;
+        
+        if (!query) {
+            resultsBox.style.display = 'none';
+            return;
+        }
+        
+        try {
+            const response = await fetch('/api/search?q=' + encodeURIComponent(query));
+            const data = await response.json();
+            // 只显示最后一次输入的结果
+            if (query === latestQuery && data.success) {
+                renderResults(data.results);
+            }
+        } catch (error) {
+            console.error('搜索失败:', error);
+        }
+    }
+    
+    function renderResults(results) {
+        resultsBox.innerHTML = '';
+        
+        if (results.length === 0) {
+            const empty = document.createElement('div');
+            empty.className = 'list-group-item text-muted';
+            empty.textContent = '没有找到相关内容';
+            resultsBox.appendChild(empty);
+        }
+        
+        results.forEach(function(result) {
+            const link = document.createElement('a');
+            link.className = 'list-group-item list-group-item-action d-flex justify-content-between align-items-center';
+            link.href = '/chapter/' + result.chapter_id;
+            
+            const text = document.createElement('div');
+            const title = document.createElement('strong');
+            title.textContent = result.text;
+            text.appendChild(title);
+            if (result.translation) {
+                const translation = document.createElement('small');
+                translation.className = 'text-muted ms-2';
+                translation.textContent = result.translation;
+                text.appendChild(translation);
+            }
+            
+            const chapter = document.createElement('span');
+            chapter.className = 'badge bg-primary rounded-pill';
+            chapter.textContent = result.chapter_name;
+            
+            link.appendChild(text);
+            link.appendChild(chapter);
+            resultsBox.appendChild(link);
+        });
+        
+        resultsBox.style.display = 'block';
+    }
+});
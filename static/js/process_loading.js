@@ -0,0 +1,124 @@
+// 内容处理进度：处理由后台worker完成，这里通过事件流实时接收每一项的结果
+document.addEventListener('DOMContentLoaded', function() {
+    const total = window.contentData.total;
+    const jobId = window.contentData.jobId;
+    const statuses = {};
+    let failedItems = {};
+    let lastEventId = 0;
+    let eventSource = null;
+
+    connect();
+
+    function connect() {
+        // 浏览器自动重连时会带上Last-Event-ID，手动重新连接时通过参数续传
+        eventSource = new EventSource('/api/process-jobs/' + jobId + '/events?last_event_id=' + lastEventId);
+
+        eventSource.onmessage = function(event) {
+            lastEventId = parseInt(event.lastEventId, 10) || lastEventId;
+            const item = JSON.parse(event.data);
+            renderItem(item);
+            updateProgress(item);
+        };
+
+        eventSource.addEventListener('done', function() {
+            eventSource.close();
+            if (Object.keys(failedItems).length === 0) {
+                showCompletion();
+            } else {
+                showErrors();
+            }
+        });
+    }
+
+    function renderItem(item) {
+        const itemElement = document.querySelector('[data-index="' + item.index + '"]');
+        if (!itemElement) return;
+
+        const statusIcon = itemElement.querySelector('.processing-status i');
+        const statusText = itemElement.querySelector('.status-text');
+        const phoneticResult = itemElement.querySelector('.phonetic-result');
+        const translationResult = itemElement.querySelector('.translation-result');
+
+        if (item.status === 'done') {
+            statusIcon.className = 'fas fa-check-circle text-success';
+            statusText.textContent = '处理完成';
+
+            if (item.phonetic) {
+                phoneticResult.querySelector('.phonetic-text').textContent = item.phonetic;
+                phoneticResult.style.display = 'block';
+            }
+            if (item.translation) {
+                translationResult.querySelector('.translation-text').textContent = item.translation;
+                translationResult.style.display = 'block';
+            }
+        } else if (item.status === 'failed') {
+            statusIcon.className = 'fas fa-times-circle text-danger';
+            statusText.textContent = '处理失败: ' + (item.error || '未知错误');
+        } else if (item.status === 'running') {
+            statusIcon.className = 'fas fa-spinner fa-spin text-primary';
+            statusText.textContent = '正在处理...';
+        } else {
+            statusIcon.className = 'fas fa-clock text-warning';
+            statusText.textContent = item.attempts > 0 ? '等待重试 (已尝试 ' + item.attempts + ' 次)' : '等待处理...';
+        }
+    }
+
+    function updateProgress(item) {
+        statuses[item.index] = item.status;
+        if (item.status === 'failed') {
+            failedItems[item.index] = item;
+        } else {
+            delete failedItems[item.index];
+        }
+
+        const totalProcessed = Object.values(statuses).filter(function(status) {
+            return status === 'done' || status === 'failed';
+        }).length;
+        const percentage = Math.round((totalProcessed / total) * 100);
+
+        document.getElementById('progress-bar').style.width = percentage + '%';
+        document.getElementById('progress-bar').setAttribute('aria-valuenow', percentage);
+        document.getElementById('progress-text').textContent = totalProcessed + ' / ' + total;
+    }
+
+    function showCompletion() {
+        document.getElementById('error-section').style.display = 'none';
+        document.getElementById('completion-section').style.display = 'block';
+    }
+
+    function showErrors() {
+        const errorSection = document.getElementById('error-section');
+        const errorDetails = document.getElementById('error-details');
+
+        const list = document.createElement('ul');
+        list.className = 'mb-0';
+        Object.values(failedItems).forEach(function(item) {
+            const li = document.createElement('li');
+            const strong = document.createElement('strong');
+            strong.textContent = item.text;
+            li.appendChild(strong);
+            li.appendChild(document.createTextNode(': ' + (item.error || '未知错误')));
+            list.appendChild(li);
+        });
+
+        errorDetails.innerHTML = '';
+        errorDetails.appendChild(list);
+        errorSection.style.display = 'block';
+    }
+
+    window.retryFailedItems = async function() {
+        const retryButton = document.querySelector('[onclick="retryFailedItems()"]');
+        retryButton.disabled = true;
+        retryButton.innerHTML = '<i class="fas fa-spinner fa-spin me-2"></i> 重试中...';
+
+        try {
+            await fetch('/api/process-jobs/' + jobId + '/retry', { method: 'POST' });
+            document.getElementById('error-section').style.display = 'none';
+            eventSource.close();
+            connect();
+        } finally {
+            retryButton.disabled = false;
+            retryButton.innerHTML = '<i class="fas fa-redo me-2"></i> 重试失败项';
+        }
+    };
+});